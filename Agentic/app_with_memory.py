@@ -13,37 +13,109 @@ import redis
 from langchain_community.utilities import WikipediaAPIWrapper
 from langchain_community.tools import WikipediaQueryRun
 from prompts import (
-    prompt_description, prompt_info, system_prompt_context, 
+    prompt_description, prompt_info, prompt_combined, system_prompt_context, 
     WIKI_CHATBOT_SYSTEM_PROMPT, CHATBOT_SYSTEM_PROMPT, CHATBOT_SYSTEM_DETECTION_PROMPT
 )
 from langchain_community.tools.tavily_search import TavilySearchResults
-from helper import get_router_chain, get_llm, get_llm_client
-from states import VlmResponse, State, Wiki_routing
+from helper import get_router_chain, get_llm, get_llm_client, get_wiki_tool, get_search_tool, VISION_MODEL
+from states import VlmResponse, State, Wiki_routing, ProductDetails, ProductDescription, CombinedVision
+from json_extract import JsonStream, JSONExtractError, extract_json
+from cache import VisionCache, SearchCache
+from blob_store import BLOB_STORE
+from latency import TRACKER, route_name
+from fast_router import FAST_ROUTER
+from structured_qa import QA, STRUCTURED_QA
+from wiki_cache import WIKI_CACHE
+from wiki_index import WIKI_INDEX
+from session_store import SessionStore
+from memory_window import WINDOW
+from fakes import FAKE, fake_redis
+from summary import SUMMARY_MODE, render_detection
 import traceback
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
 # from Utils.config import REDIS_HOST,REDIS_PORT
-from edges import input_decide_edge, workflow_edge, context_decide_edge, wiki_decide_edge
+from edges import input_decide_edge, workflow_edge, context_decide_edge, wiki_decide_edge, INPUT_NODES, EDGE_READS
 REDIS_CLIENT = 'redis://127.0.0.1:6379'
 REDIS_HOST = '127.0.0.1'
 REDIS_PORT= 6379
 load_dotenv()
 # tavily_api=os.environ['tavily_api']
-API = os.environ['GROQ_API']
+API = os.getenv('GROQ_API', '') if FAKE else os.environ['GROQ_API']
 # os.environ["TAVILY_API_KEY"] = tavily_api
+# both vision prompts for an image are sent at the same time from this pool
+VISION_WORKERS = int(os.getenv("VISION_WORKERS", "8"))
+VISION_EXECUTOR = ThreadPoolExecutor(max_workers=VISION_WORKERS, thread_name_prefix="vision")
+VISION_CACHE_SIZE = int(os.getenv("VISION_CACHE_SIZE", "256"))
+VISION_CACHE_TTL = int(os.getenv("VISION_CACHE_TTL", str(24 * 3600)))
+VISION_CACHE_REDIS = os.getenv("VISION_CACHE_REDIS", "0") == "1"
+SEARCH_MAX_RESULTS = 10
+# start the Wikipedia fetch as soon as the router picks Wiki_tool
+SPECULATIVE_WIKI = os.getenv("SPECULATIVE_WIKI", "0") == "1"
+PREFETCH_EXECUTOR = ThreadPoolExecutor(max_workers=VISION_WORKERS, thread_name_prefix="wiki_prefetch")
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "3600"))
+# SUMMARY_MODE=enhance: LLM rewrites of the local detection reply run here
+SUMMARY_EXECUTOR = ThreadPoolExecutor(max_workers=VISION_WORKERS, thread_name_prefix="summary")
+VISION_PROMPTS = {'prompt_info': prompt_info, 'prompt_description': prompt_description}
+# "single" asks for both JSON objects in one JSON-mode call instead of two
+VISION_MODE = os.getenv("VISION_MODE", "dual")
+COMBINED_VISION_PROMPTS = {'prompt_combined': prompt_combined}
+# dual mode: reply once prompt_info is back, prompt_description finishes in the
+# background and is written to the session when it arrives
+PIPELINED_VISION = os.getenv("PIPELINED_VISION", "0") == "1"
+VISION_SCHEMAS = {'prompt_info': ProductDetails, 'prompt_description': ProductDescription, 'prompt_combined': CombinedVision}
+# extra calls for a prompt whose answer does not parse or validate
+VISION_RETRIES = max(0, int(os.getenv("VISION_RETRIES", "1")))
+# stream vision answers and hang up once the JSON object is closed
+VISION_STREAM = os.getenv("VISION_STREAM", "1") == "1"
+# nodes whose LLM tokens are the user-facing reply
+STREAMED_NODES = {"chatbot_node", "wiki_chatbot_node"}
+# State fields router_node sets, matched against EDGE_READS in compile_graph
+ROUTER_WRITES = {"workflow"}
 class RedisClient:
     _instance = None
 
     @classmethod
     def get_client(cls):
         if cls._instance is None:
-            cls._instance = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
+            if FAKE:
+                cls._instance = fake_redis()
+            else:
+                cls._instance = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
         return cls._instance
 
 
+VISION_CACHE = VisionCache(
+    maxsize=VISION_CACHE_SIZE,
+    ttl=VISION_CACHE_TTL,
+    redis_client=RedisClient.get_client() if VISION_CACHE_REDIS else None,
+)
+SEARCH_CACHE = SearchCache(ttl=SEARCH_CACHE_TTL)
+
+
+def fetch_wiki(query: str) -> str:
+    return WIKI_CACHE.lookup(query, get_wiki_tool().invoke)
+
 class Shoppingass:  
-    
-    def handle_image(self, params: Dict) -> Dict:
-        image_data_url = f"data:image/jpeg;base64,{params['content']}"
+    # the compiled graph holds no per-session data (that lives in State and
+    # redis), so one instance is shared by every request in the process
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def vision_request(self, params: Dict) -> Dict:
+        """Keyword arguments for a vision chat completion (sync or async client)."""
+        # shared by the prompts in flight for this upload; handle_image releases it
+        image_data_url = BLOB_STORE.data_url(params['image_key'])
         # print(image_data_url)
         prompt_template_vision = [
                                 {
@@ -62,78 +134,212 @@ class Shoppingass:
                                     ]
                                 }
                             ]
+        request = dict(
+                    model=VISION_MODEL,
+                    messages=prompt_template_vision,
+                    temperature=1,
+                    max_tokens=1024,
+                    top_p=1,
+                    stream=VISION_STREAM,
+                    stop=None,
+                )
+        if params['prompt'] == prompt_combined:
+            # the combined answer is only usable as JSON, let the API enforce it;
+            # Groq does not stream in JSON mode
+            request['response_format'] = {"type": "json_object"}
+            request['stream'] = False
+        return request
+
+    @staticmethod
+    def parse_vision(response, schema=None) -> Dict:
+        """response is the answer text or a JsonStream; raises JSONExtractError."""
+        return {"result": extract_json(response, schema)}
+
+    @staticmethod
+    def read_stream(chunks) -> JsonStream:
+        stream = JsonStream()
+        try:
+            for chunk in chunks:
+                if chunk.choices and stream.feed(chunk.choices[0].delta.content):
+                    break
+        finally:
+            # stops generation of whatever the model adds after the object
+            chunks.close()
+        return stream
+
+    def handle_image(self, params: Dict) -> Dict:
+        """One vision prompt. An unusable answer is asked again, up to VISION_RETRIES times."""
         client = get_llm_client()
-        # print(prompt_template_vision)
-        
-        completion = client.chat.completions.create(
-                            model="meta-llama/llama-4-scout-17b-16e-instruct",
-                            messages=prompt_template_vision,
-                            temperature=1,
-                            max_tokens=1024,
-                            top_p=1,
-                            stream=False,
-                            stop=None,
-                        )
-        response = completion.choices[0].message.content
-    
-        # print("Vision resp =",response)
+        request = self.vision_request(params)
         try:
-            return {"result": json.loads(response)}
-        except json.JSONDecodeError:
-            print("NON JSON RESP")
-            print("response", response)
-            # return response
-            return {"result":response}
-        
-    
+            for attempt in range(VISION_RETRIES + 1):
+                completion = client.chat.completions.create(**request)
+                answer = self.read_stream(completion) if request['stream'] else completion.choices[0].message.content
+                try:
+                    return self.parse_vision(answer, VISION_SCHEMAS.get(params.get('name')))
+                except JSONExtractError as e:
+                    print(f"Unusable vision answer (attempt {attempt + 1}): {e}")
+                    error = e
+            raise error
+        finally:
+            BLOB_STORE.release_data_url(params['image_key'])
     
+    def start_vision_prompts(self, image_key: str, prompts: Dict):
+        """Send every prompt for one image concurrently.
+
+        Prompts already answered for the same image come from VISION_CACHE.
+        Returns ({name: cached result}, {name: future}) for the rest.
+        """
+        results = {}
+        futures = {}
+        for name, prompt in prompts.items():
+            cached = VISION_CACHE.get(image_key, name)
+            if cached is not None:
+                results[name] = cached
+            else:
+                futures[name] = VISION_EXECUTOR.submit(self.handle_image, {'image_key': image_key, 'name': name, 'prompt': prompt})
+        return results, futures
+
+    def collect_vision(self, image_key: str, name: str, future):
+        """Result of a started prompt, cached; None if its call raised."""
+        try:
+            result = future.result()['result']
+        except Exception as e:
+            print(f"Vision call '{name}' failed: {e}")
+            return None
+        VISION_CACHE.set(image_key, name, result)
+        return result
+
+    def run_vision_prompts(self, image_key: str, prompts: Dict) -> Dict:
+        """{name: result} for every prompt; a failed one maps to None so the
+        caller can decide how to degrade."""
+        results, futures = self.start_vision_prompts(image_key, prompts)
+        for name, future in futures.items():
+            results[name] = self.collect_vision(image_key, name, future)
+        return results
+
     def vision_node(self, state: State) -> State:
         print("Entered vision node")
-        # print("img bytes2:",state.image_bytes[:30])
-        
-        prod_info = self.handle_image({'content':state.image_bytes, 'prompt': prompt_info})
+        image_key = self.image_key(state)
+        if PIPELINED_VISION:
+            # a description still pending for an earlier upload is not this product's
+            with self._pending_lock:
+                self._pending_description.pop(state.session_id, None)
+        if PIPELINED_VISION and VISION_MODE != "single":
+            results, futures = self.start_vision_prompts(image_key, VISION_PROMPTS)
+            if 'prompt_info' in futures:
+                results['prompt_info'] = self.collect_vision(image_key, 'prompt_info', futures['prompt_info'])
+            pending = futures.get('prompt_description')
+            if pending is not None and results['prompt_info'] is None:
+                # nothing to reply with yet, the description is the fallback
+                results['prompt_description'] = self.collect_vision(image_key, 'prompt_description', pending)
+            elif pending is not None:
+                results['prompt_description'] = None
+                with self._pending_lock:
+                    self._pending_description[state.session_id] = (image_key, pending)
+        else:
+            results = self.run_vision_prompts(image_key, self.vision_prompts())
+        state.product_info = self.merge_vision(results)
+        print("end vision")
+        # print(state)
+        return state
+
+    def store_pending_description(self, session_id: str):
+        """Write the session's background description once it arrives.
+
+        Called after the image turn's product is stored, so the description
+        always lands on top of it.
+        """
+        if not PIPELINED_VISION:
+            return
+        with self._pending_lock:
+            entry = self._pending_description.get(session_id)
+        if entry is None:
+            return
+        image_key, future = entry
+
+        def store(done):
+            description = self.collect_vision(image_key, 'prompt_description', done)
+            with self._pending_lock:
+                current = self._pending_description.get(session_id) is entry
+            try:
+                if current and description is not None:
+                    self.session_store.set_description(session_id, description)
+            except Exception as e:
+                print(f"Failed to store description for {session_id}: {e}")
+            with self._pending_lock:
+                if self._pending_description.get(session_id) is entry:
+                    del self._pending_description[session_id]
+        future.add_done_callback(store)
+
+    def await_description(self, state: State) -> State:
+        """Wait for a description still being generated for this session."""
+        if not PIPELINED_VISION:
+            return state
+        with self._pending_lock:
+            entry = self._pending_description.get(state.session_id)
+        if entry is None or state.product_info is None:
+            return state
+        image_key, future = entry
+        print("Waiting for the product description")
+        description = self.collect_vision(image_key, 'prompt_description', future)
+        if description is not None:
+            state.product_info.description = description
+        return state
+
+    @staticmethod
+    def image_key(state: State) -> str:
+        """BLOB_STORE key of the turn's image, storing a base64 upload on the way."""
+        if state.image_key is None and state.image_bytes is not None:
+            state.image_key = BLOB_STORE.put(base64.b64decode(state.image_bytes), state.image_mime)
+            state.image_bytes = None
+        return state.image_key
+
+    @staticmethod
+    def vision_prompts() -> Dict:
+        return COMBINED_VISION_PROMPTS if VISION_MODE == "single" else VISION_PROMPTS
+
+    @staticmethod
+    def merge_vision(results: Dict) -> VlmResponse:
+        if 'prompt_combined' in results:
+            combined = results['prompt_combined'] or {}
+            results = {'prompt_info': combined.get('product_details'), 'prompt_description': combined.get('description')}
+        prod_info = results['prompt_info']
+        prod_desc = results['prompt_description']
         print("##########################got product info#########################")
         print(prod_info)
-        prod_desc = self.handle_image({'content':state.image_bytes, 'prompt': prompt_description})
         print("##########################got product desc#########################")
         print(prod_desc)
-        resp = VlmResponse(description=prod_desc['result'], product_details=prod_info['result'])
-        state.product_info = resp
-        print("end vision")
-        # print(state)
-        return state
+        if prod_info is None and prod_desc is None:
+            raise RuntimeError("Both vision calls failed for this image")
+        if prod_info is None and isinstance(prod_desc, dict) and prod_desc.get('product_name'):
+            # downstream nodes look up product_details['product']
+            prod_info = {'product': prod_desc['product_name']}
+        return VlmResponse(description=prod_desc or {}, product_details=prod_info or {})
     
     def injection_node(self,state:State):
         print("Entered injection")
-        session_id=state.session_id
         #Checks redis first
-        redis_key=f"user_memory:{session_id}"
-        memory_json= self.redis_client.get(redis_key)
-        existing_message=state.msg
-        if memory_json:
-            try:
-                mem=json.loads(memory_json)
-                if mem['product_info'] or mem['product_details']:
-                    description_dict = json.loads(mem['product_info'][-1])
-                    product_details_dict = json.loads(mem['product_details'][-1])
-                    product_info=VlmResponse(description=description_dict,
-                                            product_details=product_details_dict)
-                    # print("Product info:",product_info)
-                    state.product_info=product_info
-                if "short_term_memory" in list(mem.keys()):
-                    existing_message= mem["short_term_memory"] + existing_message
-                    state.msg=existing_message
-                # print("\n-------------------------------\nstate after inject: ",state)
-                # print("-------------------------")     
-                return state
-            except Exception as e:
-                print(f"short_term_memory:{e}")
-            # except json.JSONDecodeError as e:
-            #     return {"short_term_memory":[]}
-                return state
+        try:
+            messages, product = self.session_store.load(state.session_id)
+        except Exception as e:
+            print(f"short_term_memory:{e}")
+            return state
+        return self.await_description(self.apply_memory(state, messages, product))
+
+    @staticmethod
+    def apply_memory(state: State, messages, product) -> State:
+        if product is not None:
+            state.product_info = VlmResponse(description=product['description'],
+                                             product_details=product['product_details'])
+        if messages:
+            messages = WINDOW.fit(messages)
+            # remembered so message_to_memory only stores this turn's messages
+            state.history_len = len(messages)
+            state.msg = messages + state.msg
         else:
             print(f"No Redis cache found.")
-            return state
+        return state
 
 
     def router_node(self, state: State) -> State:
@@ -141,12 +347,55 @@ class Shoppingass:
         # print("\n-------------------------------\nstate in router: ",state)
         # print("-------------------------")    
         try:
-            chain = get_router_chain()
-            state.workflow = chain.invoke({'messages': state.msg[-1:]}).tool_usage
+            # obvious messages are routed locally, the LLM only sees the rest
+            tool = None
+            if state.msg and isinstance(state.msg[-1], str):
+                tool = FAST_ROUTER.route(state.msg[-1])
+            if tool is None:
+                chain = get_router_chain()
+                tool = chain.invoke({'messages': state.msg[-1:]}).tool_usage
+            state.workflow = tool
+            if SPECULATIVE_WIKI and tool == "Wiki_tool":
+                self.start_wiki_prefetch(state)
             return state
         except Exception as e:
                 raise(e)
 
+    def start_wiki_prefetch(self, state: State):
+        """Fetch Wikipedia for the session's product while context_node runs.
+
+        wiki_node picks the future up if the context turns out to be not
+        enough; otherwise message_to_memory drops it (the result still lands
+        in WIKI_CACHE).
+        """
+        if state.input_type != "text" or state.product_info is None:
+            return
+        query = state.product_info.product_details.get('product')
+        if not query:
+            return
+        future = PREFETCH_EXECUTOR.submit(fetch_wiki, query)
+        with self._prefetch_lock:
+            self._wiki_prefetch[state.session_id] = (query, future)
+
+    def take_wiki_prefetch(self, session_id: str, query: str = None):
+        """Pop the session's pending fetch; with a query, only if it matches."""
+        with self._prefetch_lock:
+            entry = self._wiki_prefetch.pop(session_id, None)
+        if entry is None:
+            return None
+        prefetched_query, future = entry
+        if query is not None and prefetched_query != query:
+            future.cancel()
+            return None
+        return future
+
+    def drop_wiki_prefetch(self, session_id: str):
+        """Cancel the session's pending fetch, if any; run and stream_reply call it
+        when a turn ends so a node raising mid-turn does not leave it behind."""
+        stale = self.take_wiki_prefetch(session_id)
+        if stale is not None:
+            stale.cancel()
+
 
     def context_node(self, state: State) -> State:
         print("entered contextnode")
@@ -156,20 +405,35 @@ class Shoppingass:
         if state.product_info==None:
             print("Image not uploaded")
             return state
+        answer = self.local_answer(state)
+        if answer is not None:
+            return self.apply_context_answer(state, answer)
+        response = llm.invoke(self.context_messages(state))
+        return self.apply_context_answer(state, response.content)
+
+    @staticmethod
+    def local_answer(state: State):
+        """Attribute lookups answered from the stored product JSON, None otherwise."""
+        if not STRUCTURED_QA or not state.msg:
+            return None
+        return QA.answer(state.msg[-1], state.product_info.product_details, state.product_info.description)
+
+    @staticmethod
+    def context_messages(state: State):
         user_prompt = (
                 f"### CONTEXT ###\n{state.product_info.description}\n\n"
                 f"### QUESTION ###\n{state.msg[-1:]}\n\n"
                 "Answer the question using only the context above. Also format the answer in a good short sentence"
             )
 
-        messages = [
+        return [
             {"role": "system", "content": system_prompt_context},
             {"role": "user", "content": user_prompt}
         ]
 
-        
-        response = llm.invoke(messages)
-        response = response.content.strip()
+    @staticmethod
+    def apply_context_answer(state: State, response: str) -> State:
+        response = response.strip()
         response = response.strip('\n')
         response = response.strip()
 
@@ -177,8 +441,6 @@ class Shoppingass:
         state.wiki_response = response
         wr = Wiki_routing(is_context_enough=response)
         state.routing = wr
-        
-
         return state
 
     def wiki_node(self, state: State) -> State:
@@ -187,11 +449,18 @@ class Shoppingass:
         if state.product_info==None:
             print("Image not uploaded")
             return state
-        wiki_wrappper = WikipediaAPIWrapper(top_k_results=2, doc_content_chars_max=2000)
-        wiki_tool = WikipediaQueryRun(api_wrapper= wiki_wrappper)
         query = f"{state.product_info.product_details['product']}" 
 
-        res = wiki_tool.invoke(query)
+        future = self.take_wiki_prefetch(state.session_id, query)
+        try:
+            res = future.result() if future is not None else fetch_wiki(query)
+        except Exception as e:
+            print(f"Wikipedia prefetch failed, fetching again: {e}")
+            res = fetch_wiki(query)
+        return self.apply_wiki_result(state, res)
+
+    @staticmethod
+    def apply_wiki_result(state: State, res: str) -> State:
         print("WikiNODE - :", res)
         res = "**Wikipedia Information**: " + res
         state.wiki_data = res
@@ -206,63 +475,80 @@ class Shoppingass:
         if state.product_info==None:
             print("Image not uploaded")
             return state
+        response = llm.invoke(self.wiki_chatbot_messages(state))
+        # add this response to message history and return the state
+        # hist = state.msg + [response.content]
+        # print(hist)
+        # state.msg = hist
+        # print(response.content)
+        state.wiki_response = response.content
+        return state
+
+    @staticmethod
+    def wiki_chatbot_messages(state: State):
         user_prompt = (
             f"### PRODUCT INFORMATION ###\n{state.product_info.description}\n\n"
             f"### GENERAL INFORMATION ###\n{state.wiki_data}\n\n"
             f"### QUESTION ###\n{state.msg[-1:]}\n\n"
         )
 
-        messages = [
+        return [
             {"role": "system", "content": WIKI_CHATBOT_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
         ]
 
-        
-        response = llm.invoke(messages)
-        # add this response to message history and return the state
-        # hist = state.msg + [response.content]
-        # print(hist)
-        # state.msg = hist
-        # print(response.content)
-        state.wiki_response = response.content
-        state.wiki_data = response.content
-        return state
-
     def chatbot_node(self, state: State) -> State:
         print("Entered Chatbot")
+        if state.input_type == 'image' and SUMMARY_MODE != "llm":
+            state.msg = state.msg + [render_detection(state.product_info.product_details)]
+            if SUMMARY_MODE == "enhance":
+                SUMMARY_EXECUTOR.submit(self.enhance_summary, state.session_id, self.chatbot_messages(state))
+            return state
         llm = get_llm()
+        response = llm.invoke(self.chatbot_messages(state))
+        print("Chatbot:",response.content)
+        # add this response to message history and return the state - done
+        hist = state.msg + [response.content]
+        state.msg = hist
+        
+        return state
+
+    def enhance_summary(self, session_id: str, messages):
+        """LLM rewrite of a local detection reply, kept as the session's "summary" payload."""
+        try:
+            response = get_llm().invoke(messages)
+            self.session_store.append(session_id, [], {"summary": response.content})
+        except Exception as e:
+            print(f"Summary rewrite failed for {session_id}: {e}")
+
+    @staticmethod
+    def chatbot_messages(state: State):
         user_prompt = (                
                 f"### QUESTION ###\n{state.msg[-1:]}\n\n"
                 
             )
-        messages = None
         if state.input_type == 'image':
-            messages = [
+            return [
                 {"role": "system", "content": CHATBOT_SYSTEM_DETECTION_PROMPT},
                 {"role": "user", "content": str(state.product_info.product_details)}
             ]
-        else:
-            messages = [
-                {"role": "system", "content": CHATBOT_SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt}
-            ]
-
-        
-        response = llm.invoke(messages)
-        print("Chatbot:",response.content)
-        # add this response to message history and return the state - done
-        hist = state.msg + [response.content]
-        state.msg = hist
-        
-        return state
+        return [
+            {"role": "system", "content": CHATBOT_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
     
     def scraping_node_tav(self, state: State) -> State:
         print("Entered scraping")
 
-        tav_tool = TavilySearchResults(max_results=10)
+        res = SEARCH_CACHE.search(self.links_query(state), SEARCH_MAX_RESULTS, get_search_tool(SEARCH_MAX_RESULTS).invoke)
+        return self.apply_links(state, res)
+
+    @staticmethod
+    def links_query(state: State) -> str:
+        return f"{state.product_info.product_details['product']} amazon flipkart" 
 
-        query = f"{state.product_info.product_details['product']} amazon flipkart" 
-        res = tav_tool.invoke(query)
+    @staticmethod
+    def apply_links(state: State, res) -> State:
         state.links = res
         linksadd = state.msg + [res]
         state.msg = linksadd
@@ -272,143 +558,149 @@ class Shoppingass:
         return state
 
     def message_to_memory(self,state:State):
+        # context was enough, nobody needs the speculative fetch any more
+        self.drop_wiki_prefetch(state.session_id)
+        self.add_reply(state)
         try:
-            newmessage = None
-            if state.wiki_data is not None:
-                newmessage = state.msg + [state.wiki_data]
-                state.msg = newmessage
-            # print("1------------",state.msg)
+            print("Entered message to memory node")
+            if state.input_type == "image":
+                self.session_store.set_product(state.session_id,
+                                               state.product_info.description,
+                                               state.product_info.product_details)
+                self.store_pending_description(state.session_id)
+            else:
+                self.session_store.append(state.session_id, *self.turn_memory(state))
+        except Exception as e:
+            print(f"Failed to store memory in Redis for user {state.session_id}: {str(e)}")
+        return state
+
+    @staticmethod
+    def add_reply(state: State):
+        try:
+            # the wiki/context answer is the reply; raw Wikipedia text is a
+            # tool payload and stays out of the conversation
             if state.wiki_response is not None:
                 newmessage = state.msg + [state.wiki_response]
                 state.msg = newmessage
-            # print("2------------",state.msg)
-            
-            
         except Exception as e:
             print(f"memory lol, {e}")
 
-        try:
-            print("Entered message to memory node")
-            session_id=state.session_id
-            msg=state.msg
-            redis_key=f"user_memory:{session_id}"
-            last_msg_key=f"last_message:{session_id}"
-            #Retrieve existing short term memory from Redis
-
-            existing_memory_json=self.redis_client.get(redis_key)
-            input_type=state.input_type
-            product_info=state.product_info
-            existing_memory={}
-            if input_type=="image":
-
-                try:
-                    # existing_memory=json.loads(existing_memory_json) if existing_memory else {"product_info":[],"product_details":[]}
-                    if existing_memory_json:
-                        existing_memory=json.loads(existing_memory_json)
-                        ls = list(existing_memory.keys())
-                        if "short_term_memory" not in ls:
-                            if "product_info" not in ls:
-                                existing_memory = {"product_info":[],"product_details":[], "short_term_memory": []}
-                            else:
-                                existing_memory = {
-                                    "product_info": existing_memory["product_info"],
-                                "product_details":existing_memory["product_details"],
-                                "short_term_memory": []
-                                }
-                        else:
-                            if "product_info" not in ls:
-                                existing_memory = {
-                                    "product_info": [],
-                                "product_details":[],
-                                "short_term_memory": existing_memory["short_term_memory"]
-                                }
-                            
-                    else:
-                        existing_memory = {"product_info":[],"product_details":[], "short_term_memory": []}
-                except json.JSONDecodeError as e:
-                    existing_memory={"product_info":[],"product_details":[]}
-                description=json.dumps(product_info.description)
-                product_details=json.dumps(product_info.product_details)
-                existing_memory["product_info"]=existing_memory["product_info"]+[description]
-                existing_memory["product_details"]=existing_memory["product_details"]+[product_details]
+    @staticmethod
+    def turn_memory(state: State):
+        """(history, tools) to store for this text turn."""
+        history, tools = [], {}
+        for message in state.msg[state.history_len:]:
+            if isinstance(message, str):
+                history.append(message)
             else:
-                try:
-                    # existing_memory = json.loads(existing_memory_json) if existing_memory_json else {"short_term_memory": []}
-                    if existing_memory_json:
-                        existing_memory=json.loads(existing_memory_json)
-                        ls = list(existing_memory.keys())
-                        if "short_term_memory" not in ls:
-                            if "product_info" not in ls:
-                                existing_memory = {"product_info":[],"product_details":[], "short_term_memory": []}
-                            else:
-                                existing_memory = {
-                                    "product_info": existing_memory["product_info"],
-                                "product_details":existing_memory["product_details"],
-                                "short_term_memory": []
-                                }
-                        else:
-                            if "product_info" not in ls:
-                                existing_memory = {
-                                    "product_info": [],
-                                "product_details":[],
-                                "short_term_memory": existing_memory["short_term_memory"]
-                                }
-                            
-                    else:
-                        existing_memory = {"product_info":[],"product_details":[], "short_term_memory": []}
-    
-                except json.JSONDecodeError as e:
-                    print(f"Failed to parse existing memory for user {session_id}: {str(e)}")
-                    existing_memory = {"short_term_memory": []}
-                existing_memory["short_term_memory"]=existing_memory["short_term_memory"]+msg
-        except Exception as e:
-            print(f"memory fati, {e}")
-
-        #Process new messages
-        
-        now_timestamp=datetime.now().timestamp()
-        try:
-            with self.redis_client.pipeline() as pipe:
-                pipe.setex(redis_key, 120 ,json.dumps(existing_memory))
-                pipe.set(last_msg_key, now_timestamp)
-                result=pipe.execute()
-                # print(f"Successfully stored memory in Redis for user: {session_id}")
-        except Exception as e:
-            print(f"Failed to store memory in Redis for user {session_id}: {str(e)}")
-        return state
+                # link results: remember a one-line note, keep the payload aside
+                history.append(f"(shared {len(message)} shopping links)")
+        if state.links is not None:
+            tools['links'] = state.links
+        if state.wiki_data is not None:
+            tools['wiki'] = state.wiki_data
+        return history, tools
 
     def compile_graph(self):
         graph_builder = StateGraph(State)
         
-        graph_builder.add_node("vision_node", self.vision_node)
-        graph_builder.add_node("injection_node", self.injection_node)
-        graph_builder.add_node("router_node", self.router_node)
-        graph_builder.add_node("context_node", self.context_node)
-        graph_builder.add_node("wiki_node", self.wiki_node)
-        graph_builder.add_node("wiki_chatbot_node", self.wiki_chatbot_node)
-        graph_builder.add_node("chatbot_node", self.chatbot_node)
-        graph_builder.add_node("scraping_node_tav", self.scraping_node_tav)
-        graph_builder.add_node("message_to_memory", self.message_to_memory)
+        nodes = {
+            "vision_node": self.vision_node,
+            "injection_node": self.injection_node,
+            "router_node": self.router_node,
+            "context_node": self.context_node,
+            "wiki_node": self.wiki_node,
+            "wiki_chatbot_node": self.wiki_chatbot_node,
+            "chatbot_node": self.chatbot_node,
+            "scraping_node_tav": self.scraping_node_tav,
+            "message_to_memory": self.message_to_memory,
+        }
+        # every node is timed into the process-wide latency tracker
+        for name, node in nodes.items():
+            graph_builder.add_node(name, TRACKER.timed_node(name, node))
 
         
         # Add edges
         graph_builder.add_conditional_edges(START, input_decide_edge)
-        graph_builder.add_edge("vision_node","router_node")
-        graph_builder.add_edge("injection_node", "router_node")
+        for input_type, entry in INPUT_NODES.items():
+            if ROUTER_WRITES & EDGE_READS[workflow_edge][input_type]:
+                graph_builder.add_edge(entry, "router_node")
+            else:
+                # the router's answer would be thrown away, skip its LLM call
+                graph_builder.add_conditional_edges(entry, workflow_edge)
         graph_builder.add_conditional_edges("router_node", workflow_edge)
         graph_builder.add_conditional_edges("context_node", context_decide_edge)
         graph_builder.add_conditional_edges("wiki_node", wiki_decide_edge)
         graph_builder.add_edge("wiki_chatbot_node", "message_to_memory")
         graph_builder.add_edge("chatbot_node", "message_to_memory")
+        graph_builder.add_edge("scraping_node_tav", "message_to_memory")
 
         graph_builder.add_edge("message_to_memory", END)
         
         return graph_builder.compile()
 
+    def stream_reply(self, state: State):
+        """Run the graph and yield the reply as it is produced.
+
+        Tokens from STREAMED_NODES are yielded as they arrive. Routes that end
+        without one of those nodes (a context answer, shopping links) yield
+        the final message once the graph has finished.
+        """
+        start = time.perf_counter()
+        streamed = False
+        final = None
+        try:
+            for mode, chunk in self.graph.stream(state, stream_mode=["messages", "values"]):
+                if mode == "messages":
+                    message, metadata = chunk
+                    if metadata.get("langgraph_node") in STREAMED_NODES and message.content:
+                        streamed = True
+                        yield message.content
+                else:
+                    final = chunk
+        finally:
+            self.drop_wiki_prefetch(state.session_id)
+        if final is not None:
+            TRACKER.record("route", route_name(final), time.perf_counter() - start)
+        if not streamed and final is not None:
+            yield final['msg'][-1]
+
+    def run(self, state: State) -> Dict:
+        """Invoke the graph for one turn and record its latency by route."""
+        start = time.perf_counter()
+        try:
+            result = self.graph.invoke(state)
+        finally:
+            self.drop_wiki_prefetch(state.session_id)
+        TRACKER.record("route", route_name(result), time.perf_counter() - start)
+        return result
+
     def __init__(self):
         self.redis_client = RedisClient.get_client()
+        self.session_store = SessionStore(self.redis_client)
+        # session_id -> (query, future) for speculative Wikipedia fetches
+        self._wiki_prefetch = {}
+        self._prefetch_lock = threading.Lock()
+        # session_id -> (image key, future) for PIPELINED_VISION descriptions
+        self._pending_description = {}
+        self._pending_lock = threading.Lock()
         self.graph= self.compile_graph()
         
         
 
-    
\ No newline at end of file
+    
+
+
+def get_graph():
+    return Shoppingass.get_instance().graph
+
+
+def cache_stats():
+    return {
+        "vision": VISION_CACHE.stats(),
+        "wiki": WIKI_CACHE.stats(),
+        "search": SEARCH_CACHE.stats(),
+        "blobs": BLOB_STORE.stats(),
+        "structured_qa": QA.stats(),
+        "wiki_index": WIKI_INDEX.stats() if WIKI_INDEX is not None else None,
+    }
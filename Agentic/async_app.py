@@ -0,0 +1,330 @@
+"""asyncio variant of the Shoppingass graph.
+
+Same nodes, edges and prompts as app_with_memory.Shoppingass, but every
+network call is awaited (AsyncGroq, ChatGroq.ainvoke, redis.asyncio, httpx
+for Wikipedia and Tavily), so one event loop can keep many sessions in
+flight instead of parking a thread per request.
+"""
+import sys
+import os
+import asyncio
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+import redis.asyncio as aioredis
+from typing_extensions import Dict
+from app_with_memory import (
+    Shoppingass, VISION_CACHE, SEARCH_CACHE, SEARCH_MAX_RESULTS, SPECULATIVE_WIKI,
+    STREAMED_NODES, VISION_RETRIES, VISION_SCHEMAS, VISION_PROMPTS, VISION_MODE, PIPELINED_VISION,
+    REDIS_HOST, REDIS_PORT,
+)
+from helper import get_llm, get_router_chain, get_async_llm_client, awiki_search, asearch_links
+from states import State
+from json_extract import JsonStream, JSONExtractError
+from latency import TRACKER, route_name
+from fast_router import FAST_ROUTER
+from wiki_cache import WIKI_CACHE
+from blob_store import BLOB_STORE
+from session_store import AsyncSessionStore
+from fakes import FAKE, fake_async_redis
+from summary import SUMMARY_MODE, render_detection
+
+
+class AsyncRedisClient:
+    _instance = None
+
+    @classmethod
+    def get_client(cls):
+        if cls._instance is None:
+            if FAKE:
+                cls._instance = fake_async_redis()
+            else:
+                cls._instance = aioredis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
+        return cls._instance
+
+
+async def afetch_wiki(query: str) -> str:
+    value = await WIKI_CACHE.aget(query)
+    if value is None:
+        value = await awiki_search(query)
+        await WIKI_CACHE.aset(query, value)
+    return value
+
+
+class AsyncShoppingass(Shoppingass):
+    # separate singleton slot, the sync instance must not be handed out here
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @staticmethod
+    async def read_stream(chunks) -> JsonStream:
+        stream = JsonStream()
+        try:
+            async for chunk in chunks:
+                if chunk.choices and stream.feed(chunk.choices[0].delta.content):
+                    break
+        finally:
+            await chunks.close()
+        return stream
+
+    async def handle_image(self, params: Dict) -> Dict:
+        client = get_async_llm_client()
+        request = self.vision_request(params)
+        try:
+            for attempt in range(VISION_RETRIES + 1):
+                completion = await client.chat.completions.create(**request)
+                answer = await self.read_stream(completion) if request['stream'] else completion.choices[0].message.content
+                try:
+                    return self.parse_vision(answer, VISION_SCHEMAS.get(params.get('name')))
+                except JSONExtractError as e:
+                    print(f"Unusable vision answer (attempt {attempt + 1}): {e}")
+                    error = e
+            raise error
+        finally:
+            BLOB_STORE.release_data_url(params['image_key'])
+
+    async def start_vision_prompts(self, image_key: str, prompts: Dict):
+        results = {}
+        tasks = {}
+        for name, prompt in prompts.items():
+            cached = await VISION_CACHE.aget(image_key, name)
+            if cached is not None:
+                results[name] = cached
+            else:
+                tasks[name] = asyncio.ensure_future(self.handle_image({'image_key': image_key, 'name': name, 'prompt': prompt}))
+        return results, tasks
+
+    async def collect_vision(self, image_key: str, name: str, task):
+        try:
+            result = (await task)['result']
+        except Exception as e:
+            print(f"Vision call '{name}' failed: {e}")
+            return None
+        await VISION_CACHE.aset(image_key, name, result)
+        return result
+
+    async def run_vision_prompts(self, image_key: str, prompts: Dict) -> Dict:
+        results, tasks = await self.start_vision_prompts(image_key, prompts)
+        for name, task in tasks.items():
+            results[name] = await self.collect_vision(image_key, name, task)
+        return results
+
+    async def vision_node(self, state: State) -> State:
+        print("Entered vision node")
+        image_key = self.image_key(state)
+        if PIPELINED_VISION:
+            with self._pending_lock:
+                self._pending_description.pop(state.session_id, None)
+        if PIPELINED_VISION and VISION_MODE != "single":
+            results, tasks = await self.start_vision_prompts(image_key, VISION_PROMPTS)
+            if 'prompt_info' in tasks:
+                results['prompt_info'] = await self.collect_vision(image_key, 'prompt_info', tasks['prompt_info'])
+            pending = tasks.get('prompt_description')
+            if pending is not None and results['prompt_info'] is None:
+                results['prompt_description'] = await self.collect_vision(image_key, 'prompt_description', pending)
+            elif pending is not None:
+                results['prompt_description'] = None
+                with self._pending_lock:
+                    self._pending_description[state.session_id] = (image_key, pending)
+        else:
+            results = await self.run_vision_prompts(image_key, self.vision_prompts())
+        state.product_info = self.merge_vision(results)
+        print("end vision")
+        return state
+
+    def store_pending_description(self, session_id: str):
+        if not PIPELINED_VISION:
+            return
+        with self._pending_lock:
+            entry = self._pending_description.get(session_id)
+        if entry is None:
+            return
+        self.background(self.store_description(session_id, entry))
+
+    async def store_description(self, session_id: str, entry):
+        image_key, task = entry
+        description = await self.collect_vision(image_key, 'prompt_description', task)
+        with self._pending_lock:
+            current = self._pending_description.get(session_id) is entry
+        try:
+            if current and description is not None:
+                await self.session_store.set_description(session_id, description)
+        except Exception as e:
+            print(f"Failed to store description for {session_id}: {e}")
+        with self._pending_lock:
+            if self._pending_description.get(session_id) is entry:
+                del self._pending_description[session_id]
+
+    async def await_description(self, state: State) -> State:
+        if not PIPELINED_VISION:
+            return state
+        with self._pending_lock:
+            entry = self._pending_description.get(state.session_id)
+        if entry is None or state.product_info is None:
+            return state
+        image_key, task = entry
+        print("Waiting for the product description")
+        description = await self.collect_vision(image_key, 'prompt_description', task)
+        if description is not None:
+            state.product_info.description = description
+        return state
+
+    def background(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        # the loop only keeps weak references to tasks
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def injection_node(self, state: State):
+        print("Entered injection")
+        try:
+            messages, product = await self.session_store.load(state.session_id)
+        except Exception as e:
+            print(f"short_term_memory:{e}")
+            return state
+        return await self.await_description(self.apply_memory(state, messages, product))
+
+    async def router_node(self, state: State) -> State:
+        print("entered router")
+        tool = None
+        if state.msg and isinstance(state.msg[-1], str):
+            tool = FAST_ROUTER.route(state.msg[-1])
+        if tool is None:
+            chain = get_router_chain()
+            tool = (await chain.ainvoke({'messages': state.msg[-1:]})).tool_usage
+        state.workflow = tool
+        if SPECULATIVE_WIKI and tool == "Wiki_tool":
+            self.start_wiki_prefetch(state)
+        return state
+
+    def start_wiki_prefetch(self, state: State):
+        if state.input_type != "text" or state.product_info is None:
+            return
+        query = state.product_info.product_details.get('product')
+        if not query:
+            return
+        task = asyncio.ensure_future(afetch_wiki(query))
+        with self._prefetch_lock:
+            self._wiki_prefetch[state.session_id] = (query, task)
+
+    async def context_node(self, state: State) -> State:
+        print("entered contextnode")
+        if state.product_info==None:
+            print("Image not uploaded")
+            return state
+        answer = self.local_answer(state)
+        if answer is not None:
+            return self.apply_context_answer(state, answer)
+        response = await get_llm().ainvoke(self.context_messages(state))
+        return self.apply_context_answer(state, response.content)
+
+    async def wiki_node(self, state: State) -> State:
+        print("entered wikinode")
+        if state.product_info==None:
+            print("Image not uploaded")
+            return state
+        query = f"{state.product_info.product_details['product']}"
+
+        task = self.take_wiki_prefetch(state.session_id, query)
+        try:
+            res = await task if task is not None else await afetch_wiki(query)
+        except Exception as e:
+            print(f"Wikipedia prefetch failed, fetching again: {e}")
+            res = await afetch_wiki(query)
+        return self.apply_wiki_result(state, res)
+
+    async def wiki_chatbot_node(self, state: State) -> State:
+        if state.product_info==None:
+            print("Image not uploaded")
+            return state
+        response = await get_llm().ainvoke(self.wiki_chatbot_messages(state))
+        state.wiki_response = response.content
+        return state
+
+    async def chatbot_node(self, state: State) -> State:
+        print("Entered Chatbot")
+        if state.input_type == 'image' and SUMMARY_MODE != "llm":
+            state.msg = state.msg + [render_detection(state.product_info.product_details)]
+            if SUMMARY_MODE == "enhance":
+                self.background(self.enhance_summary(state.session_id, self.chatbot_messages(state)))
+            return state
+        response = await get_llm().ainvoke(self.chatbot_messages(state))
+        print("Chatbot:",response.content)
+        state.msg = state.msg + [response.content]
+        return state
+
+    async def enhance_summary(self, session_id: str, messages):
+        try:
+            response = await get_llm().ainvoke(messages)
+            await self.session_store.append(session_id, [], {"summary": response.content})
+        except Exception as e:
+            print(f"Summary rewrite failed for {session_id}: {e}")
+
+    async def scraping_node_tav(self, state: State) -> State:
+        print("Entered scraping")
+        res = await SEARCH_CACHE.asearch(self.links_query(state), SEARCH_MAX_RESULTS, asearch_links)
+        return self.apply_links(state, res)
+
+    async def message_to_memory(self, state: State):
+        self.drop_wiki_prefetch(state.session_id)
+        self.add_reply(state)
+        try:
+            print("Entered message to memory node")
+            if state.input_type == "image":
+                await self.session_store.set_product(state.session_id,
+                                                     state.product_info.description,
+                                                     state.product_info.product_details)
+                self.store_pending_description(state.session_id)
+            else:
+                await self.session_store.append(state.session_id, *self.turn_memory(state))
+        except Exception as e:
+            print(f"Failed to store memory in Redis for user {state.session_id}: {str(e)}")
+        return state
+
+    async def astream_reply(self, state: State):
+        """Async counterpart of stream_reply."""
+        start = time.perf_counter()
+        streamed = False
+        final = None
+        try:
+            async for mode, chunk in self.graph.astream(state, stream_mode=["messages", "values"]):
+                if mode == "messages":
+                    message, metadata = chunk
+                    if metadata.get("langgraph_node") in STREAMED_NODES and message.content:
+                        streamed = True
+                        yield message.content
+                else:
+                    final = chunk
+        finally:
+            self.drop_wiki_prefetch(state.session_id)
+        if final is not None:
+            TRACKER.record("route", route_name(final), time.perf_counter() - start)
+        if not streamed and final is not None:
+            yield final['msg'][-1]
+
+    async def arun(self, state: State) -> Dict:
+        """Await the graph for one turn and record its latency by route."""
+        start = time.perf_counter()
+        try:
+            result = await self.graph.ainvoke(state)
+        finally:
+            self.drop_wiki_prefetch(state.session_id)
+        TRACKER.record("route", route_name(result), time.perf_counter() - start)
+        return result
+
+    def __init__(self):
+        self.redis_client = AsyncRedisClient.get_client()
+        self.session_store = AsyncSessionStore(self.redis_client)
+        # session_id -> (query, asyncio task) for speculative Wikipedia fetches
+        self._wiki_prefetch = {}
+        self._prefetch_lock = threading.Lock()
+        # session_id -> (image key, task) for PIPELINED_VISION descriptions
+        self._pending_description = {}
+        self._pending_lock = threading.Lock()
+        # summary rewrites and description writes still running
+        self._background_tasks = set()
+        self.graph = self.compile_graph()
+
+
+def get_async_graph():
+    return AsyncShoppingass.get_instance().graph
@@ -0,0 +1,250 @@
+import asyncio
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class TTLCache:
+    """Thread-safe in-process cache with LRU eviction and per-entry TTL."""
+
+    def __init__(self, maxsize=256, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+
+def normalize_query(text: str) -> str:
+    text = text.lower().strip()
+    text = re.sub(r"[^\w\s-]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class VisionCache:
+    """Parsed vision results keyed by (BLOB_STORE key, prompt name).
+
+    Lookups go to the in-process LRU first and then, if a redis client is
+    given, to redis so other workers can reuse the result.
+    """
+
+    def __init__(self, maxsize=256, ttl=24 * 3600, redis_client=None, prefix="vision_cache"):
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.redis_client = redis_client
+        self.prefix = prefix
+        self.redis_hits = 0
+
+    def _redis_key(self, image_key, prompt_name):
+        return f"{self.prefix}:{image_key}:{prompt_name}"
+
+    def get(self, image_key, prompt_name):
+        value = self.local.get((image_key, prompt_name))
+        if value is not None or self.redis_client is None:
+            return value
+        return self._redis_get(image_key, prompt_name)
+
+    async def aget(self, image_key, prompt_name):
+        """get() for async callers, the redis round trip runs off the event loop."""
+        value = self.local.get((image_key, prompt_name))
+        if value is not None or self.redis_client is None:
+            return value
+        return await asyncio.to_thread(self._redis_get, image_key, prompt_name)
+
+    def _redis_get(self, image_key, prompt_name):
+        try:
+            raw = self.redis_client.get(self._redis_key(image_key, prompt_name))
+        except Exception as e:
+            print(f"Vision cache redis get failed: {e}")
+            return None
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        self.redis_hits += 1
+        self.local.set((image_key, prompt_name), value)
+        return value
+
+    def set(self, image_key, prompt_name, value):
+        # only parsed JSON is worth keeping, raw strings mean the VLM misbehaved
+        if not isinstance(value, dict):
+            return
+        self.local.set((image_key, prompt_name), value)
+        if self.redis_client is not None:
+            self._redis_set(image_key, prompt_name, value)
+
+    async def aset(self, image_key, prompt_name, value):
+        """set() for async callers, the redis write runs off the event loop."""
+        if not isinstance(value, dict):
+            return
+        self.local.set((image_key, prompt_name), value)
+        if self.redis_client is not None:
+            await asyncio.to_thread(self._redis_set, image_key, prompt_name, value)
+
+    def _redis_set(self, image_key, prompt_name, value):
+        try:
+            self.redis_client.setex(self._redis_key(image_key, prompt_name), self.local.ttl, json.dumps(value))
+        except Exception as e:
+            print(f"Vision cache redis set failed: {e}")
+
+    def stats(self):
+        local = self.local.stats()
+        return {
+            "hits": local["hits"] + self.redis_hits,
+            "misses": local["misses"] - self.redis_hits,
+            "redis_hits": self.redis_hits,
+            "size": local["size"],
+        }
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one.
+
+    The first caller runs fn(); callers arriving while it is in flight wait
+    for and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines running on one event loop.
+
+    The call runs in its own task that every caller awaits through
+    asyncio.shield, so a caller that is cancelled (a request hitting its
+    timeout) stops waiting without cancelling the call for the others.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.coalesced = 0
+
+    async def do(self, key, coro_fn):
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(coro_fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # mark it retrieved so a failure nobody waited for isn't logged as unhandled
+        if not task.cancelled():
+            task.exception()
+
+
+class SearchCache:
+    """Web search results keyed by (normalized query, max_results), with
+    identical in-flight searches coalesced into one outbound call."""
+
+    def __init__(self, maxsize=512, ttl=3600):
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.flight = SingleFlight()
+        self.async_flight = AsyncSingleFlight()
+        self.searches = 0
+
+    def search(self, query, max_results, fetch):
+        """Return results for query, calling fetch(query) only on a miss."""
+        key = (normalize_query(query), max_results)
+        cached = self.local.get(key)
+        if cached is not None:
+            return cached
+
+        def run():
+            self.searches += 1
+            result = fetch(query)
+            # tools return an error string instead of raising, don't keep those
+            if isinstance(result, list):
+                self.local.set(key, result)
+            return result
+
+        return self.flight.do(key, run)
+
+    async def asearch(self, query, max_results, afetch):
+        """search() for async callers; afetch is a coroutine function."""
+        key = (normalize_query(query), max_results)
+        cached = self.local.get(key)
+        if cached is not None:
+            return cached
+
+        async def run():
+            self.searches += 1
+            result = await afetch(query)
+            if isinstance(result, list):
+                self.local.set(key, result)
+            return result
+
+        return await self.async_flight.do(key, run)
+
+    def stats(self):
+        local = self.local.stats()
+        return {
+            "hits": local["hits"],
+            "misses": local["misses"],
+            "coalesced": self.flight.coalesced + self.async_flight.coalesced,
+            "searches": self.searches,
+            "size": local["size"],
+        }
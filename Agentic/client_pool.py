@@ -0,0 +1,37 @@
+import threading
+from collections import Counter
+import httpx
+
+# keep-alive connections are shared by every Groq/ChatGroq client in the process
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
+
+_pool = {}
+# re-entrant: a factory may itself ask the pool for a client (router chain -> llm)
+_lock = threading.RLock()
+constructions = Counter()
+
+
+def pooled(key, factory):
+    """Return the object stored under key, building it with factory() on first use."""
+    obj = _pool.get(key)
+    if obj is None:
+        with _lock:
+            obj = _pool.get(key)
+            if obj is None:
+                obj = factory()
+                _pool[key] = obj
+                constructions[key[0]] += 1
+    return obj
+
+
+def get_http_client():
+    return pooled(("http",), lambda: httpx.Client(limits=HTTP_LIMITS, timeout=httpx.Timeout(60.0, connect=10.0)))
+
+
+def reset_pool():
+    with _lock:
+        http_client = _pool.pop(("http",), None)
+        _pool.clear()
+        constructions.clear()
+    if http_client is not None:
+        http_client.close()
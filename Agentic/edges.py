@@ -2,6 +2,9 @@ from typing_extensions import Literal, Dict
 from states import State
 
 
+# where each input type enters the graph
+INPUT_NODES = {"image": "vision_node", "text": "injection_node"}
+
 
 def input_decide_edge(state: State) -> Literal["vision_node", "injection_node"]:        
         if state.input_type == "image":
@@ -22,6 +25,17 @@ def workflow_edge(state: State) -> Literal["context_node", "scraping_node_tav",
             return "scraping_node_tav"
         else:
             return "chatbot_node"
+
+
+# State fields each conditional edge reads, per input type. compile_graph
+# leaves out a node when nothing it writes is read by the edge after it.
+EDGE_READS = {
+    # an image turn goes to chatbot_node whatever the router decided
+    workflow_edge: {
+        "image": {"product_info", "input_type"},
+        "text": {"product_info", "input_type", "workflow"},
+    },
+}
         
 
 def context_decide_edge(state: State) -> Literal["wiki_node", "message_to_memory"]:
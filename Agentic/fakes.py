@@ -0,0 +1,312 @@
+"""Deterministic local stand-ins for Groq, Tavily, Wikipedia and redis.
+
+Set AGENT_BACKEND=fake and every client getter in helper.py (and the redis
+singletons) hands out these instead, so the whole graph runs offline with
+no API keys. Replies depend only on the input, and each call sleeps for a
+configurable time so runs keep realistic timings for load and regression
+tests:
+
+    FAKE_LLM_LATENCY      seconds before the first chat token (0.3)
+    FAKE_TOKENS_PER_SEC   chat / vision generation speed (250)
+    FAKE_REPLY_TOKENS     length of a chat reply in words (40)
+    FAKE_VISION_LATENCY   seconds per vision call before generation (0.8)
+    FAKE_TOOL_LATENCY     seconds per Tavily / Wikipedia call (0.25)
+    FAKE_VISION_NOISE     share of vision answers that come back fenced, chatty,
+                          truncated or otherwise broken the way real ones do (0)
+"""
+import asyncio
+import json
+import itertools
+import os
+import random
+import time
+import zlib
+from types import SimpleNamespace
+from typing import List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+from fast_router import rule_route
+
+AGENT_BACKEND = os.getenv("AGENT_BACKEND", "live")
+FAKE = AGENT_BACKEND == "fake"
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.3"))
+FAKE_TOKENS_PER_SEC = float(os.getenv("FAKE_TOKENS_PER_SEC", "250"))
+FAKE_REPLY_TOKENS = int(os.getenv("FAKE_REPLY_TOKENS", "40"))
+FAKE_VISION_LATENCY = float(os.getenv("FAKE_VISION_LATENCY", "0.8"))
+FAKE_TOOL_LATENCY = float(os.getenv("FAKE_TOOL_LATENCY", "0.25"))
+FAKE_VISION_NOISE = float(os.getenv("FAKE_VISION_NOISE", "0"))
+
+# what the fake vision model "sees", picked by a hash of the image
+CATALOGUE = [
+    {"product": "t-shirt", "brand": "Nike", "style": "Graphic T-shirt", "material": "Cotton",
+     "product_name": "Nike Graphic T-Shirt", "category": "Fashion - Apparel"},
+    {"product": "headphones", "brand": "Sony", "style": "Over-ear", "material": "Plastic",
+     "product_name": "Sony WH-1000XM5 Wireless Headphones", "category": "Electronics - Audio"},
+    {"product": "bike", "brand": "Trek", "style": "Mountain bike", "material": "Aluminium",
+     "product_name": "Trek Marlin 5 Mountain Bike", "category": "Sports - Cycling"},
+    {"product": "fabric", "brand": None, "style": "Paisley", "material": "Cotton",
+     "product_name": "Yellow and Green Paisley Fabric", "category": "Textiles - Fabrics"},
+]
+FILLER = ("this is a deterministic placeholder reply from the offline chat model used "
+          "for load testing the shopping assistant without calling any paid api").split()
+
+
+def _pick(text: str, n: int) -> int:
+    return zlib.crc32(text.encode()) % n
+
+
+def fake_reply(messages: List[BaseMessage]) -> str:
+    """Canned answer shaped like the one the real prompt would get."""
+    prompt = "\n".join(str(m.content) for m in messages)
+    if "### CONTEXT ###" in prompt:
+        # about half the questions are answerable from the product description
+        if _pick(prompt, 2):
+            return "NOT FOUND"
+        return "It is made of cotton and suits everyday wear."
+    words = [FILLER[i % len(FILLER)] for i in range(FAKE_REPLY_TOKENS)]
+    if "### GENERAL INFORMATION ###" in prompt:
+        words = ["According", "to", "Wikipedia,"] + words
+    return " ".join(words)
+
+
+class FakeChatModel(BaseChatModel):
+    """ChatGroq stand-in: fixed time to first token, then a steady token rate."""
+
+    latency: float = FAKE_LLM_LATENCY
+    tokens_per_second: float = FAKE_TOKENS_PER_SEC
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-groq"
+
+    def _tokens(self, messages, route=False):
+        if route:
+            # router call: the fast-router rules decide, no_tool when none match
+            tool, _ = rule_route(str(messages[-1].content))
+            return [tool or "no_tool"]
+        words = fake_reply(messages).split(" ")
+        return [w if i == 0 else " " + w for i, w in enumerate(words)]
+
+    def _generate(self, messages, stop=None, run_manager=None, route=False, **kwargs) -> ChatResult:
+        tokens = self._tokens(messages, route)
+        time.sleep(self.latency + len(tokens) / self.tokens_per_second)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(tokens)))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, route=False, **kwargs) -> ChatResult:
+        tokens = self._tokens(messages, route)
+        await asyncio.sleep(self.latency + len(tokens) / self.tokens_per_second)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(tokens)))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        for token in self._tokens(messages):
+            time.sleep(1 / self.tokens_per_second)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        for token in self._tokens(messages):
+            await asyncio.sleep(1 / self.tokens_per_second)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    def with_structured_output(self, schema, **kwargs):
+        """Router stand-in: a normal (timed, traced) model call whose reply is the tool name."""
+        return self.bind(route=True) | RunnableLambda(lambda message: schema(tool_usage=message.content))
+
+
+def _vision_completion(kwargs):
+    content = kwargs["messages"][0]["content"]
+    prompt = content[0]["text"]
+    image_url = content[1]["image_url"]["url"]
+    item = CATALOGUE[_pick(image_url, len(CATALOGUE))]
+    details = {k: item[k] for k in ("product", "brand", "style", "material")}
+    description = {
+            "product_name": item["product_name"],
+            "category": item["category"],
+            "detailed_explanation": f"A {item['style'].lower()} {item['product']} made of {item['material'].lower()}.",
+            "common_uses": ["Everyday use"],
+            "who_might_use_this": ["Anyone"],
+            "related_products_or_alternatives": [],
+    }
+    if "product_details" in prompt:
+        result = {"product_details": details, "description": description}
+    elif "product_name" in prompt:
+        result = description
+    else:
+        result = details
+    text = _vision_noise(json.dumps(result, indent=2))
+    completion_tokens = len(text) // 4
+    # ~1200 prompt tokens is roughly what an image costs on Groq's vision models
+    usage = SimpleNamespace(prompt_tokens=len(prompt) // 4 + 1200, completion_tokens=completion_tokens,
+                            total_tokens=len(prompt) // 4 + 1200 + completion_tokens)
+    completion = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))], usage=usage)
+    delay = FAKE_VISION_LATENCY + completion_tokens / FAKE_TOKENS_PER_SEC
+    return completion, delay
+
+
+_VISION_CALLS = itertools.count()
+TRAILER = ("The image shows the product clearly against a plain background, so the attributes above "
+           "should be reliable. Let me know if you would like more details, price comparisons or "
+           "suggestions for similar items in other styles and materials.")
+
+
+def _vision_noise(text: str) -> str:
+    """Break a share of the answers, a different share on every call so retries can succeed."""
+    rng = random.Random(next(_VISION_CALLS))
+    if rng.random() >= FAKE_VISION_NOISE:
+        return text
+    kind = rng.choice(["fenced", "chatty", "trailing_comma", "truncated", "missing_key"])
+    if kind == "fenced":
+        return f"```json\n{text}\n```\n{TRAILER}"
+    if kind == "chatty":
+        return f"Here is the JSON for the product in the image:\n{text}\n\n{TRAILER}"
+    if kind == "trailing_comma":
+        return text[:text.rindex("\n")] + ",\n}"
+    if kind == "truncated":
+        return text[:len(text) * 2 // 3]
+    # the key downstream nodes need is left out
+    first = text.index(",\n")
+    return "{" + text[first + 1:]
+
+
+def _chunks(completion):
+    text = completion.choices[0].message.content
+    # eight tokens of four characters per chunk
+    for i in range(0, len(text), 32):
+        yield text[i:i + 32], 8 / FAKE_TOKENS_PER_SEC
+
+
+def _chunk(piece):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+
+class FakeStream:
+    """Streamed vision answer; generation stops when the reader closes it."""
+
+    def __init__(self, completion):
+        self.completion = completion
+        self.closed = False
+
+    def __iter__(self):
+        time.sleep(FAKE_VISION_LATENCY)
+        for piece, delay in _chunks(self.completion):
+            if self.closed:
+                return
+            time.sleep(delay)
+            yield _chunk(piece)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncStream(FakeStream):
+    async def __aiter__(self):
+        await asyncio.sleep(FAKE_VISION_LATENCY)
+        for piece, delay in _chunks(self.completion):
+            if self.closed:
+                return
+            await asyncio.sleep(delay)
+            yield _chunk(piece)
+
+    async def close(self):
+        self.closed = True
+
+
+class _Completions:
+    def create(self, **kwargs):
+        completion, delay = _vision_completion(kwargs)
+        if kwargs.get("stream"):
+            return FakeStream(completion)
+        time.sleep(delay)
+        return completion
+
+
+class _AsyncCompletions:
+    async def create(self, **kwargs):
+        completion, delay = _vision_completion(kwargs)
+        if kwargs.get("stream"):
+            return FakeAsyncStream(completion)
+        await asyncio.sleep(delay)
+        return completion
+
+
+class FakeGroq:
+    """Groq client stand-in for vision calls (client.chat.completions.create)."""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=_Completions())
+
+
+class FakeAsyncGroq:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=_AsyncCompletions())
+
+
+def _search_results(query, max_results):
+    slug = "-".join(query.lower().split())
+    shops = ["amazon.in", "flipkart.com", "myntra.com", "ajio.com", "tatacliq.com"]
+    return [
+        {"title": f"{query} | {shops[i % len(shops)]}", "url": f"https://www.{shops[i % len(shops)]}/{slug}-{i}",
+         "content": f"Buy {query} online at the best price.", "score": round(1 - i / 20, 2)}
+        for i in range(max_results)
+    ]
+
+
+def _wiki_text(query, top_k_results, doc_content_chars_max):
+    title = query.strip().title() or "Product"
+    pages = [f"Page: {title}\nSummary: {title} is a commonly sold consumer product. " + " ".join(FILLER)]
+    pages += [f"Page: History of {title}\nSummary: The history of {title.lower()}." for _ in range(top_k_results - 1)]
+    return "\n\n".join(pages)[:doc_content_chars_max]
+
+
+class FakeSearchTool:
+    """TavilySearchResults stand-in."""
+
+    def __init__(self, max_results=10):
+        self.max_results = max_results
+
+    def invoke(self, query):
+        time.sleep(FAKE_TOOL_LATENCY)
+        return _search_results(query, self.max_results)
+
+
+class FakeWikiTool:
+    """WikipediaQueryRun stand-in."""
+
+    def __init__(self, top_k_results=2, doc_content_chars_max=2000):
+        self.top_k_results = top_k_results
+        self.doc_content_chars_max = doc_content_chars_max
+
+    def invoke(self, query):
+        time.sleep(FAKE_TOOL_LATENCY)
+        return _wiki_text(query, self.top_k_results, self.doc_content_chars_max)
+
+
+async def awiki_search(query, top_k_results=2, doc_content_chars_max=2000):
+    await asyncio.sleep(FAKE_TOOL_LATENCY)
+    return _wiki_text(query, top_k_results, doc_content_chars_max)
+
+
+async def asearch_links(query, max_results=10):
+    await asyncio.sleep(FAKE_TOOL_LATENCY)
+    return _search_results(query, max_results)
+
+
+def fake_redis():
+    import fakeredis
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def fake_async_redis():
+    import fakeredis
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
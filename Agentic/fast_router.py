@@ -0,0 +1,112 @@
+import json
+import os
+import re
+
+# (tool, weight, pattern) - strong cues weigh 1.0 or more, weak cues less.
+# A tool's score is the sum of its matching weights.
+RULES = [
+    ("links_tool", 2.0, r"\b(buy|purchase|order|links?|shop(ping)?|amazon|flipkart|price|cost|cheap(er|est)?|deals?)\b"),
+    ("links_tool", 1.0, r"\b(recommend|suggest(ions?)?|similar|alternatives?|options)\b|\bhow much\b|\bwhere can i\b"),
+    ("Wiki_tool", 1.0, r"^(explain|tell me about|describe)\b|\bwikipedia\b|\bhistory of\b|\bmade (of|from)\b"),
+    # what the product is: these make a question a Wiki question
+    ("Wiki_tool", 0.6, r"\b(brand|material|fabric|colou?rs?|quality|features?|specs?|waterproof|durable|wash|clean"
+                       r"|works?|popular|makes?|manufacturer|meaning|origin)\b"),
+    # question shape and a reference to the product only add up to a guess,
+    # "how are you?" or "what do you think?" are chat and stay with the LLM
+    ("Wiki_tool", 0.3, r"^(what|who|why|how|when|which|is|are|does|do|can|could|will|should)\b"),
+    ("Wiki_tool", 0.2, r"\?\s*$"),
+    ("Wiki_tool", 0.2, r"\b(this|it|these|product|item)\b"),
+    ("no_tool", 1.0, r"^((hi|hello|hey|hii+|thanks|thank you|thx|ok(ay)?|cool|nice|great|bye|good (morning|afternoon|evening|night))\b[\s!.,]*(there|a lot|so much)?[\s!.,]*)+$"),
+    ("no_tool", 4.0, r"\b(who are you|what can you do|what do you do|your name)\b"),
+]
+COMPILED_RULES = [(tool, weight, re.compile(pattern, re.IGNORECASE)) for tool, weight, pattern in RULES]
+# "I don't want to buy it, tell me about ..." flips the cue it negates, leave it to the LLM
+NEGATION = re.compile(r"\b(not|never|no longer|don'?t|doesn'?t|won'?t|can'?t|isn'?t|aren'?t)\b", re.IGNORECASE)
+
+FAST_ROUTER_THRESHOLD = float(os.getenv("FAST_ROUTER_THRESHOLD", "0.8"))
+ROUTER_TRAINING_DATA = os.getenv("ROUTER_TRAINING_DATA")
+
+
+def rule_route(text: str):
+    """Score the message against RULES.
+
+    Returns (tool, confidence). Confidence is the winning tool's share of the
+    total score, capped by how strong its own cues were, so a lone weak cue
+    or two tools tying never clears the threshold.
+    """
+    scores = {}
+    for tool, weight, pattern in COMPILED_RULES:
+        if pattern.search(text):
+            scores[tool] = scores.get(tool, 0.0) + weight
+    if not scores:
+        return None, 0.0
+    tool = max(scores, key=scores.get)
+    top = scores[tool]
+    return tool, (top / sum(scores.values())) * min(1.0, top)
+
+
+def load_examples(path):
+    """(texts, labels) from a JSONL of {"text", "label"}; label null means only the LLM should route it."""
+    with open(path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [row["text"] for row in rows], [row["label"] for row in rows]
+
+
+def train_classifier(path):
+    """TF-IDF + logistic regression over a labelled JSONL of {"text", "label"}.
+
+    Needs scikit-learn; returns None if it is not installed.
+    """
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+    except ImportError:
+        print("scikit-learn not installed, fast router runs on rules only")
+        return None
+    texts, labels = load_examples(path)
+    texts, labels = zip(*[(text, label) for text, label in zip(texts, labels) if label is not None])
+    model = make_pipeline(
+        TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True),
+        LogisticRegression(max_iter=1000),
+    )
+    model.fit(texts, labels)
+    return model
+
+
+class FastRouter:
+    """Local pre-router in front of the LLM router chain.
+
+    route() returns a tool name when the rules (or the optional classifier)
+    are confident enough, otherwise None and the caller asks the LLM.
+    """
+
+    def __init__(self, threshold=FAST_ROUTER_THRESHOLD, classifier=None):
+        self.threshold = threshold
+        self.classifier = classifier
+        self.fast = 0
+        self.fallback = 0
+
+    def predict(self, text: str):
+        if NEGATION.search(text):
+            return None, 0.0
+        tool, confidence = rule_route(text)
+        if confidence >= self.threshold or self.classifier is None:
+            return tool, confidence
+        probs = self.classifier.predict_proba([text])[0]
+        best = probs.argmax()
+        return self.classifier.classes_[best], float(probs[best])
+
+    def route(self, text: str):
+        tool, confidence = self.predict(text)
+        if tool is not None and confidence >= self.threshold:
+            self.fast += 1
+            return tool
+        self.fallback += 1
+        return None
+
+    def stats(self):
+        return {"fast": self.fast, "llm_fallback": self.fallback}
+
+
+FAST_ROUTER = FastRouter(classifier=train_classifier(ROUTER_TRAINING_DATA) if ROUTER_TRAINING_DATA else None)
@@ -1,28 +1,134 @@
 from langchain_core.prompts import ChatPromptTemplate , MessagesPlaceholder
 from langchain_groq import ChatGroq
 import os
+import asyncio
 from dotenv import load_dotenv
-from groq import Groq
+from groq import Groq, AsyncGroq
+import httpx
+from langchain_community.utilities import WikipediaAPIWrapper
+from langchain_community.tools import WikipediaQueryRun
+from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain_core.prompts import ChatPromptTemplate , MessagesPlaceholder
 from prompts import ROUTER_PROMPT
 from states import RouterResponse
+from client_pool import pooled, get_http_client, HTTP_LIMITS
+import fakes
+from fakes import FAKE
+from wiki_index import WIKI_INDEX, WikiIndexTool
 
 load_dotenv()
-API = os.environ['GROQ_API']
+# AGENT_BACKEND=fake swaps every client below for the offline stand-ins in fakes.py
+API = os.getenv('GROQ_API', '') if FAKE else os.environ['GROQ_API']
+CHAT_MODEL = os.getenv("CHAT_MODEL", "gemma2-9b-it")
+VISION_MODEL = os.getenv("VISION_MODEL", "meta-llama/llama-4-scout-17b-16e-instruct")
+# extra client settings per model name
+MODEL_OPTIONS = {
+    CHAT_MODEL: {"max_retries": 2},
+    VISION_MODEL: {"max_retries": 2, "timeout": 60},
+}
 
-def get_llm():
-    llm = ChatGroq(api_key=API, model="gemma2-9b-it")
-    return llm
+# Clients and chains are built once per model and shared across threads,
+# so every node reuses the same warm HTTP connections.
 
-def get_llm_client():
-    client = Groq(api_key=API)
-    return client
+def get_llm(model=CHAT_MODEL):
+    if FAKE:
+        return pooled(("llm", model), fakes.FakeChatModel)
+    options = MODEL_OPTIONS.get(model, {})
+    return pooled(("llm", model), lambda: ChatGroq(api_key=API, model=model, http_client=get_http_client(), **options))
 
-def get_router_chain():
-    model = get_llm().with_structured_output(RouterResponse)
+def get_llm_client(model=VISION_MODEL):
+    if FAKE:
+        return pooled(("client", model), fakes.FakeGroq)
+    options = MODEL_OPTIONS.get(model, {})
+    return pooled(("client", model), lambda: Groq(api_key=API, http_client=get_http_client(), **options))
 
-    prompt = ChatPromptTemplate.from_messages(
-        [("system", ROUTER_PROMPT), MessagesPlaceholder(variable_name="messages")]
-    )
+def get_router_chain(model=CHAT_MODEL):
+    def build():
+        structured = get_llm(model).with_structured_output(RouterResponse)
 
-    return prompt | model
\ No newline at end of file
+        prompt = ChatPromptTemplate.from_messages(
+            [("system", ROUTER_PROMPT), MessagesPlaceholder(variable_name="messages")]
+        )
+
+        return prompt | structured
+
+    return pooled(("router_chain", model), build)
+
+def get_wiki_tool(top_k_results=2, doc_content_chars_max=2000):
+    def build():
+        if FAKE:
+            tool = fakes.FakeWikiTool(top_k_results, doc_content_chars_max)
+        else:
+            wrapper = WikipediaAPIWrapper(top_k_results=top_k_results, doc_content_chars_max=doc_content_chars_max)
+            tool = WikipediaQueryRun(api_wrapper=wrapper)
+        if WIKI_INDEX is not None:
+            # WIKI_INDEX_PATH set: the offline index answers, the live tool only on a miss
+            return WikiIndexTool(WIKI_INDEX, tool, top_k_results, doc_content_chars_max)
+        return tool
+
+    return pooled(("wiki_tool", top_k_results, doc_content_chars_max), build)
+
+def get_search_tool(max_results=10):
+    if FAKE:
+        return pooled(("search_tool", max_results), lambda: fakes.FakeSearchTool(max_results))
+    return pooled(("search_tool", max_results), lambda: TavilySearchResults(max_results=max_results))
+
+# async backends, used by the asyncio graph in async_app.py
+
+WIKIPEDIA_API = "https://en.wikipedia.org/w/api.php"
+TAVILY_API = "https://api.tavily.com/search"
+
+def get_async_llm_client(model=VISION_MODEL):
+    if FAKE:
+        return pooled(("async_client", model), fakes.FakeAsyncGroq)
+    options = MODEL_OPTIONS.get(model, {})
+    return pooled(("async_client", model), lambda: AsyncGroq(api_key=API, **options))
+
+def get_async_http_client():
+    # Wikipedia rejects clients without a descriptive User-Agent
+    return pooled(("async_http",), lambda: httpx.AsyncClient(
+        limits=HTTP_LIMITS, timeout=httpx.Timeout(30.0, connect=10.0),
+        headers={"User-Agent": "ShoppeeAssistant/1.0 (https://github.com/Kushaagra-exe/MultiAgent-ShoppeeAssistant)"},
+    ))
+
+async def awiki_search(query, top_k_results=2, doc_content_chars_max=2000):
+    """Async equivalent of WikipediaQueryRun(WikipediaAPIWrapper(...)).invoke(query)."""
+    if WIKI_INDEX is not None:
+        # SQLite I/O under a lock shared with the sync graph, keep it off the event loop
+        text = await asyncio.to_thread(WIKI_INDEX.lookup, query, top_k_results, doc_content_chars_max)
+        if text is not None:
+            return text
+    if FAKE:
+        return await fakes.awiki_search(query, top_k_results, doc_content_chars_max)
+    client = get_async_http_client()
+    search = await client.get(WIKIPEDIA_API, params={
+        "action": "query", "list": "search", "srsearch": query[:300],
+        "srlimit": top_k_results, "format": "json",
+    })
+    search.raise_for_status()
+    titles = [hit["title"] for hit in search.json()["query"]["search"]]
+    if not titles:
+        return "No good Wikipedia Search Result was found"
+    pages = await client.get(WIKIPEDIA_API, params={
+        "action": "query", "prop": "extracts", "exintro": 1, "explaintext": 1,
+        "redirects": 1, "titles": "|".join(titles), "format": "json",
+    })
+    pages.raise_for_status()
+    extracts = {page["title"]: page.get("extract", "") for page in pages.json()["query"]["pages"].values()}
+    summaries = [f"Page: {title}\nSummary: {extracts[title]}" for title in titles if extracts.get(title)]
+    if not summaries:
+        return "No good Wikipedia Search Result was found"
+    return "\n\n".join(summaries)[:doc_content_chars_max]
+
+async def asearch_links(query, max_results=10):
+    """Async equivalent of TavilySearchResults(max_results=...).invoke(query)."""
+    if FAKE:
+        return await fakes.asearch_links(query, max_results)
+    response = await get_async_http_client().post(TAVILY_API, json={
+        "api_key": os.environ.get("TAVILY_API_KEY", ""), "query": query, "max_results": max_results,
+    })
+    response.raise_for_status()
+    return [
+        {"title": r.get("title"), "url": r["url"], "content": r["content"], "score": r.get("score")}
+        for r in response.json().get("results", [])
+    ]
@@ -0,0 +1,48 @@
+import base64
+import os
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+# the VLM downsamples anything larger, so bigger uploads only cost bandwidth
+IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", "1024"))
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "JPEG").upper()
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+
+MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+
+def prepare_image(image, max_side=IMAGE_MAX_SIDE, format=IMAGE_FORMAT, quality=IMAGE_QUALITY):
+    """Shrink an upload to what the VLM actually looks at.
+
+    image is a PIL Image, raw bytes or a file-like object. The picture is
+    rotated by its EXIF orientation, scaled so its longest side is at most
+    max_side, flattened onto white if it has transparency and re-encoded.
+    EXIF and other metadata are dropped. Returns (bytes, mime_type).
+    """
+    if isinstance(image, bytes):
+        image = BytesIO(image)
+    if not isinstance(image, Image.Image):
+        image = Image.open(image)
+    if image.format == "JPEG":
+        # let the decoder skip detail the resize would throw away
+        image.draft("RGB", (max_side, max_side))
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    buffered = BytesIO()
+    image.save(buffered, format=format, quality=quality, optimize=True)
+    return buffered.getvalue(), MIME_TYPES[format]
+
+
+def prepare_image_base64(image, **kwargs):
+    """prepare_image, base64-encoded for the vision request. Returns (b64, mime_type)."""
+    data, mime = prepare_image(image, **kwargs)
+    return base64.b64encode(data).decode(), mime
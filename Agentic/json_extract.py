@@ -0,0 +1,154 @@
+import ast
+import json
+import re
+
+from pydantic import BaseModel, ValidationError
+
+TRAILING_COMMA = re.compile(r",\s*([}\]])")
+# a string value ending a line with the next key on the following line, comma forgotten
+MISSING_COMMA = re.compile(r'"\s*\n(\s*)"')
+SMART_QUOTES = str.maketrans({"“": '"', "”": '"'})
+PY_LITERALS = [(re.compile(r"\btrue\b"), "True"), (re.compile(r"\bfalse\b"), "False"), (re.compile(r"\bnull\b"), "None")]
+
+
+class JSONExtractError(ValueError):
+    """No usable JSON object in a model answer."""
+
+
+class JsonStream:
+    """Incremental scanner for the first JSON object in model output.
+
+    Text before the opening brace (prose, a ```json fence) is skipped and
+    feed() returns True as soon as the matching closing brace arrives, so a
+    streamed answer can be cut there. Braces inside strings are ignored.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.stack = []
+        self.started = False
+        self.done = False
+        self.in_string = False
+        self.escape = False
+        self.length = 0
+        # (length, open brackets) after the last complete member, for truncated answers
+        self.safe = None
+
+    def feed(self, chunk: str) -> bool:
+        if self.done or not chunk:
+            return self.done
+        start = 0
+        end = len(chunk)
+        for i, ch in enumerate(chunk):
+            if not self.started:
+                if ch == "{":
+                    self.started = True
+                    self.stack.append("}")
+                    start = i
+                continue
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.stack.append("}" if ch == "{" else "]")
+            elif ch in "}]":
+                if self.stack:
+                    self.stack.pop()
+                if not self.stack:
+                    self.done = True
+                    end = i + 1
+                    break
+            elif ch == ",":
+                self.safe = (self.length + i - start, list(self.stack))
+        if self.started:
+            self.parts.append(chunk[start:end])
+            self.length += end - start
+        return self.done
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def closed_text(self):
+        """The object so far with open brackets closed, or None if it was cut inside a value.
+
+        A string or number cut off by max_tokens ("shi" for "shirt") is not
+        closed and kept, it would pass for a real value.
+        """
+        text = self.text
+        if self.done:
+            return text
+        text = text.rstrip()
+        if self.in_string or not text.endswith(('"', "}", "]", ",", "{", "[")):
+            return None
+        return text.rstrip(",") + "".join(reversed(self.stack))
+
+    def salvaged_text(self):
+        """The object cut back to its last complete member, or None."""
+        if self.safe is None:
+            return None
+        length, stack = self.safe
+        return self.text[:length] + "".join(reversed(stack))
+
+
+def loads_lenient(text: str):
+    """json.loads, then again after fixing what models commonly get wrong."""
+    try:
+        return json.loads(text, strict=False)
+    except json.JSONDecodeError:
+        pass
+    fixed = MISSING_COMMA.sub(r'",\n\1"', TRAILING_COMMA.sub(r"\1", text.translate(SMART_QUOTES)))
+    try:
+        return json.loads(fixed, strict=False)
+    except json.JSONDecodeError:
+        pass
+    # single quotes and Python literals
+    for pattern, literal in PY_LITERALS:
+        fixed = pattern.sub(literal, fixed)
+    try:
+        return ast.literal_eval(fixed)
+    except (ValueError, SyntaxError, MemoryError, RecursionError) as e:
+        raise JSONExtractError(f"unparseable JSON: {text[:200]!r}") from e
+
+
+def extract_json(text, schema: type[BaseModel] = None) -> dict:
+    """First JSON object in a model answer, repaired and optionally validated.
+
+    text is the raw answer or a JsonStream already fed with it. Fences and
+    surrounding prose are dropped, trailing and missing commas, smart or
+    single quotes and Python literals are fixed, and an answer cut off by
+    max_tokens is closed at its last complete member, so a required field
+    that was cut off fails validation. With a schema the object is validated
+    and returned as the schema's dump. Raises
+    JSONExtractError when nothing usable is left.
+    """
+    stream = text
+    if not isinstance(stream, JsonStream):
+        stream = JsonStream()
+        stream.feed(text or "")
+    if not stream.started:
+        raise JSONExtractError(f"no JSON object in answer: {str(text)[:200]!r}")
+    closed = stream.closed_text()
+    try:
+        if closed is None:
+            raise JSONExtractError(f"answer cut off inside a value: {stream.text[-200:]!r}")
+        value = loads_lenient(closed)
+    except JSONExtractError:
+        salvaged = stream.salvaged_text()
+        if salvaged is None:
+            raise
+        value = loads_lenient(salvaged)
+    if not isinstance(value, dict):
+        raise JSONExtractError(f"expected a JSON object, got {type(value).__name__}")
+    if schema is not None:
+        try:
+            value = schema.model_validate(value).model_dump()
+        except ValidationError as e:
+            raise JSONExtractError(f"answer does not match {schema.__name__}: {e}") from e
+    return value
@@ -0,0 +1,87 @@
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+# samples kept per node / route, old ones fall off
+MAX_SAMPLES = 2000
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_samples))))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+class LatencyTracker:
+    """Rolling latency samples per graph node and per route."""
+
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.max_samples = max_samples
+        self._samples = defaultdict(lambda: deque(maxlen=self.max_samples))
+        self._lock = threading.Lock()
+
+    def record(self, kind, name, seconds):
+        with self._lock:
+            self._samples[(kind, name)].append(seconds)
+
+    def timed_node(self, name, fn):
+        """Wrap a graph node so every call is recorded under ("node", name)."""
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(state):
+                start = time.perf_counter()
+                try:
+                    return await fn(state)
+                finally:
+                    self.record("node", name, time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(state):
+            start = time.perf_counter()
+            try:
+                return fn(state)
+            finally:
+                self.record("node", name, time.perf_counter() - start)
+        return wrapper
+
+    def summary(self):
+        with self._lock:
+            items = [(key, sorted(samples)) for key, samples in self._samples.items()]
+        report = {"node": {}, "route": {}}
+        for (kind, name), samples in items:
+            report[kind][name] = {
+                "count": len(samples),
+                "p50_ms": percentile(samples, 50) * 1000,
+                "p95_ms": percentile(samples, 95) * 1000,
+                "p99_ms": percentile(samples, 99) * 1000,
+            }
+        return report
+
+    def dump_json(self, path=None):
+        data = json.dumps(self.summary(), indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(data)
+        return data
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+
+def route_name(state) -> str:
+    """Label a finished turn by the path it took through the graph."""
+    if state.get("input_type") == "image":
+        return "image"
+    if state.get("product_info") is None:
+        return "no_product"
+    return state.get("workflow") or "no_tool"
+
+
+TRACKER = LatencyTracker()
@@ -0,0 +1,56 @@
+import math
+import os
+
+WINDOW_MAX_MESSAGES = int(os.getenv("WINDOW_MAX_MESSAGES", "20"))
+WINDOW_MAX_TOKENS = int(os.getenv("WINDOW_MAX_TOKENS", "2000"))
+SUMMARY_MAX_CHARS = 400
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, ~4 chars per token otherwise."""
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def summarize(messages) -> str:
+    """Cheap local summary of evicted messages: the start of each one."""
+    parts = [" ".join(m.split())[:60] for m in messages if m.strip()]
+    return ("Earlier in this conversation: " + " | ".join(parts))[:SUMMARY_MAX_CHARS]
+
+
+class ConversationWindow:
+    """Keep the most recent messages that fit in both a count and a token budget.
+
+    Older messages are folded into a single summary line at the front so the
+    history (and everything built from it) stays a bounded size no matter
+    how long the session runs.
+    """
+
+    def __init__(self, max_messages=WINDOW_MAX_MESSAGES, max_tokens=WINDOW_MAX_TOKENS):
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+
+    def fit(self, messages):
+        kept = []
+        used = 0
+        for message in reversed(messages):
+            tokens = count_tokens(message)
+            if len(kept) >= self.max_messages or used + tokens > self.max_tokens:
+                break
+            kept.append(message)
+            used += tokens
+        kept.reverse()
+        evicted = messages[:len(messages) - len(kept)]
+        if evicted:
+            kept.insert(0, summarize(evicted))
+        return kept
+
+
+WINDOW = ConversationWindow()
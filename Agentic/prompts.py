@@ -98,6 +98,38 @@ Dont write anything else. no suggestions
 
 """
 
+# one call instead of prompt_info + prompt_description, sent with JSON mode on
+prompt_combined = """
+You are a helpful shopping assistant. Look at the product in this image and return ONE JSON object with exactly two keys:
+
+"product_details": the short shopping attributes of the object.
+- The key product should hold the name of the object (e.g., phone), *only the product name, no brand or other descriptors*.
+- Add other relevant keys such as brand, style, quality, color, material and features, chosen according to the image.
+
+"description": an easy-to-understand explanation for someone with no prior knowledge of the product, with the keys
+"product_name", "category", "detailed_explanation", "common_uses", "who_might_use_this" and "related_products_or_alternatives".
+
+Example:
+{
+  "product_details": {
+    "product": "headphones",
+    "brand": "Sony",
+    "style": "Over-ear",
+    "quality": "High",
+    "features": ["Noise Cancelling", "Wireless", "Cushioned Ear Cups"]
+  },
+  "description": {
+    "product_name": "Sony WH-1000XM5 Wireless Noise Cancelling Headphones",
+    "category": "Electronics - Audio",
+    "detailed_explanation": "These are over-ear wireless headphones that block out background sound, made for long, comfortable listening sessions.",
+    "common_uses": ["Listening to music", "Taking calls", "Blocking noise while traveling"],
+    "who_might_use_this": ["Commuters", "Students", "Music enthusiasts"],
+    "related_products_or_alternatives": ["Bose QuietComfort 45", "Apple AirPods Max"]
+  }
+}
+Return only the JSON object. No description or any other content.
+"""
+
 ROUTER_PROMPT = """ 
 You are an AI converstaional assistant and you are responsible to make descisions on What tool do we need to use to provide the user with the necessary information he needs.
 You have to take into account the whole conversation so far to make a decision to determine what would be the best next choice of tool to use.
@@ -0,0 +1,270 @@
+"""Headless HTTP API for the shopping assistant.
+
+Run one process:
+    python Agentic/server.py
+or several behind a load balancer (sessions live in redis, so any worker
+can serve any turn):
+    cd Agentic && uvicorn server:app --host 0.0.0.0 --port 8000 --workers 4
+
+Endpoints (session_id comes from the client):
+    POST /sessions/{session_id}/text    {"message": "..."}  -> JSON reply
+    POST /sessions/{session_id}/image   multipart "file"    -> JSON reply
+    POST /sessions/{session_id}/stream  {"message": "..."}  -> text/plain token stream
+    GET  /sessions/{session_id}/summary -> LLM rewrite of the last detection reply
+                                           (SUMMARY_MODE=enhance), null until ready
+    GET  /health, GET /stats
+
+SERVER_MODE=async runs AsyncShoppingass on the event loop; SERVER_MODE=sync
+runs Shoppingass on a pool of SERVER_WORKERS threads. At most
+SERVER_MAX_CONCURRENCY turns run at once (no more than SERVER_WORKERS in
+sync mode), SERVER_MAX_QUEUE more may wait for a slot and anything beyond
+that gets 429. A turn that takes longer than SERVER_REQUEST_TIMEOUT seconds
+gets 504; in sync mode its slot stays taken until the worker thread is done.
+"""
+import sys
+import os
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from app_with_memory import Shoppingass, cache_stats
+from async_app import AsyncShoppingass
+from latency import TRACKER, route_name
+from states import State
+from image_utils import prepare_image
+from blob_store import BLOB_STORE
+
+SERVER_MODE = os.getenv("SERVER_MODE", "async")
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "16"))
+SERVER_MAX_CONCURRENCY = int(os.getenv("SERVER_MAX_CONCURRENCY", "64"))
+SERVER_MAX_QUEUE = int(os.getenv("SERVER_MAX_QUEUE", "128"))
+SERVER_REQUEST_TIMEOUT = float(os.getenv("SERVER_REQUEST_TIMEOUT", "60"))
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+# sync mode only: the graph runs on these threads, not on the event loop
+TURN_EXECUTOR = ThreadPoolExecutor(max_workers=SERVER_WORKERS, thread_name_prefix="turn") if SERVER_MODE == "sync" else None
+
+
+class TextTurn(BaseModel):
+    message: str
+
+
+class TurnReply(BaseModel):
+    session_id: str
+    route: str
+    reply: Optional[str] = None
+    links: Optional[List[Dict]] = None
+    product: Optional[Dict] = None
+
+
+class Admission:
+    """Bounded concurrency with a bounded wait queue in front of it."""
+
+    def __init__(self, max_concurrency=SERVER_MAX_CONCURRENCY, max_queue=SERVER_MAX_QUEUE):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.admitted = 0
+        self.running = 0
+        self.rejected = 0
+
+    async def acquire(self):
+        if self.admitted >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(status_code=429, detail="Server busy, try again shortly", headers={"Retry-After": "1"})
+        self.admitted += 1
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            self.admitted -= 1
+            raise
+        self.running += 1
+
+    def release(self):
+        self.running -= 1
+        self.admitted -= 1
+        self._slots.release()
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "queued": self.admitted - self.running,
+            "rejected": self.rejected,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+        }
+
+
+app = FastAPI(title="Shoppee Assistant")
+# sync mode: a slot per worker thread, more would only wait in the executor's queue
+ADMISSION = Admission(min(SERVER_MAX_CONCURRENCY, SERVER_WORKERS) if SERVER_MODE == "sync" else SERVER_MAX_CONCURRENCY)
+
+
+def get_agent():
+    if SERVER_MODE == "sync":
+        return Shoppingass.get_instance()
+    return AsyncShoppingass.get_instance()
+
+
+def release_when_done(future):
+    """Give the admission slot back once a TURN_EXECUTOR job has finished.
+
+    A timeout only stops the waiting, the thread carries on with the turn,
+    so releasing on the caller's side would admit more work than there are
+    threads for it.
+    """
+    loop = asyncio.get_running_loop()
+
+    def release(_):
+        # nothing to give back once the server has shut down
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(ADMISSION.release)
+
+    future.add_done_callback(release)
+
+
+async def run_turn(state: State, inflight: Dict) -> Dict:
+    agent = get_agent()
+    if SERVER_MODE == "sync":
+        inflight['future'] = TURN_EXECUTOR.submit(agent.run, state)
+        return await asyncio.wrap_future(inflight['future'])
+    return await agent.arun(state)
+
+
+async def stream_turn(state: State, inflight: Dict):
+    agent = get_agent()
+    if SERVER_MODE != "sync":
+        async for token in agent.astream_reply(state):
+            yield token
+        return
+    tokens = agent.stream_reply(state)
+    done = object()
+    while True:
+        inflight['future'] = TURN_EXECUTOR.submit(next, tokens, done)
+        token = await asyncio.wrap_future(inflight['future'])
+        if token is done:
+            return
+        yield token
+
+
+def to_reply(session_id: str, result: Dict) -> TurnReply:
+    last = result['msg'][-1] if result.get('msg') else None
+    reply = TurnReply(session_id=session_id, route=route_name(result))
+    if isinstance(last, list):
+        reply.links = last
+    else:
+        reply.reply = last
+    if result.get('input_type') == "image" and result.get('product_info') is not None:
+        reply.product = result['product_info'].product_details
+    return reply
+
+
+def admission_release(inflight: Dict):
+    """Release now, or when the executor job in inflight (sync mode) finishes."""
+    future = inflight.get('future')
+    if future is not None and not future.done():
+        release_when_done(future)
+    else:
+        ADMISSION.release()
+
+
+def store_upload(data: bytes) -> str:
+    return BLOB_STORE.put(*prepare_image(data))
+
+
+async def handle(state: State, upload: bytes = None) -> TurnReply:
+    await ADMISSION.acquire()
+    inflight = {}
+    try:
+        if upload is not None:
+            # decode, resize and re-encode take ~200ms for a phone photo: under the
+            # admission slot, and off the event loop
+            try:
+                state.image_key = await asyncio.to_thread(store_upload, upload)
+            except Exception:
+                raise HTTPException(status_code=400, detail="Not a readable image")
+        result = await asyncio.wait_for(run_turn(state, inflight), timeout=SERVER_REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Turn timed out")
+    finally:
+        admission_release(inflight)
+    return to_reply(state.session_id, result)
+
+
+@app.post("/sessions/{session_id}/text", response_model=TurnReply)
+async def text_turn(session_id: str, turn: TextTurn):
+    return await handle(State(session_id=session_id, msg=[turn.message], input_type="text"))
+
+
+@app.post("/sessions/{session_id}/image", response_model=TurnReply)
+async def image_turn(session_id: str, file: UploadFile = File(...)):
+    return await handle(State(session_id=session_id, msg=[], input_type="image"), upload=await file.read())
+
+
+@app.post("/sessions/{session_id}/stream")
+async def streamed_text_turn(session_id: str, turn: TextTurn):
+    state = State(session_id=session_id, msg=[turn.message], input_type="text")
+    await ADMISSION.acquire()
+    inflight = {}
+    released = False
+
+    def release():
+        # called by the stream when it ends and again after the response,
+        # which also covers a client that disconnects before the first token
+        nonlocal released
+        if not released:
+            released = True
+            admission_release(inflight)
+
+    async def body():
+        # the slot is held until the last token is sent
+        deadline = time.monotonic() + SERVER_REQUEST_TIMEOUT
+        tokens = stream_turn(state, inflight)
+        try:
+            while True:
+                try:
+                    token = await asyncio.wait_for(tokens.__anext__(), timeout=max(0.0, deadline - time.monotonic()))
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    print(f"Stream for {session_id} timed out")
+                    break
+                if isinstance(token, list):
+                    token = "\n".join(link.get('url', '') for link in token)
+                yield token
+        finally:
+            await tokens.aclose()
+            release()
+
+    return StreamingResponse(body(), media_type="text/plain; charset=utf-8", background=BackgroundTask(release))
+
+
+@app.get("/sessions/{session_id}/summary")
+async def enhanced_summary(session_id: str):
+    agent = get_agent()
+    if SERVER_MODE == "sync":
+        text = await asyncio.get_running_loop().run_in_executor(
+            TURN_EXECUTOR, agent.session_store.tool_payload, session_id, "summary")
+    else:
+        text = await agent.session_store.tool_payload(session_id, "summary")
+    return {"session_id": session_id, "summary": text}
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "mode": SERVER_MODE}
+
+
+@app.get("/stats")
+async def stats():
+    return {"admission": ADMISSION.stats(), "latency": TRACKER.summary(), "caches": cache_stats()}
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=SERVER_HOST, port=SERVER_PORT)
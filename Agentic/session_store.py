@@ -0,0 +1,175 @@
+import json
+import os
+from datetime import datetime
+
+SESSION_TTL = int(os.getenv("SESSION_TTL", "120"))
+SESSION_MAX_MESSAGES = int(os.getenv("SESSION_MAX_MESSAGES", "50"))
+# run the append as one Lua script instead of a MULTI/EXEC pipeline
+SESSION_USE_LUA = os.getenv("SESSION_USE_LUA", "0") == "1"
+
+APPEND_SCRIPT = """
+if #ARGV >= 5 then
+    redis.call('RPUSH', KEYS[1], unpack(ARGV, 5))
+end
+redis.call('LTRIM', KEYS[1], -tonumber(ARGV[1]), -1)
+if ARGV[4] ~= '' then
+    for field, value in pairs(cjson.decode(ARGV[4])) do
+        redis.call('HSET', KEYS[4], field, value)
+    end
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+redis.call('EXPIRE', KEYS[4], ARGV[2])
+redis.call('SET', KEYS[3], ARGV[3])
+return redis.call('LLEN', KEYS[1])
+"""
+
+
+class SessionStore:
+    """Per-session memory in native redis structures.
+
+    user_memory:{id}:messages  LIST of JSON-encoded messages, capped at max_messages
+    user_memory:{id}:product   HASH with the latest description / product_details
+    user_memory:{id}:tools     HASH with the last payload of each tool (links, wiki),
+                               kept out of the message history
+    last_message:{id}          timestamp of the last write
+
+    Every write is a constant number of commands in one round-trip, no
+    matter how long the history is.
+    """
+
+    def __init__(self, redis_client, ttl=SESSION_TTL, max_messages=SESSION_MAX_MESSAGES, use_lua=SESSION_USE_LUA):
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.max_messages = max_messages
+        self._append_script = redis_client.register_script(APPEND_SCRIPT) if use_lua else None
+
+    @staticmethod
+    def messages_key(session_id):
+        return f"user_memory:{session_id}:messages"
+
+    @staticmethod
+    def product_key(session_id):
+        return f"user_memory:{session_id}:product"
+
+    @staticmethod
+    def tools_key(session_id):
+        return f"user_memory:{session_id}:tools"
+
+    @staticmethod
+    def last_message_key(session_id):
+        return f"last_message:{session_id}"
+
+    def _queue_load(self, pipe, session_id):
+        pipe.lrange(self.messages_key(session_id), 0, -1)
+        pipe.hgetall(self.product_key(session_id))
+
+    @staticmethod
+    def _decode_load(raw_messages, raw_product):
+        messages = [json.loads(m) for m in raw_messages]
+        product = None
+        if raw_product.get("product_details"):
+            product = {
+                "description": json.loads(raw_product.get("description") or "{}"),
+                "product_details": json.loads(raw_product["product_details"]),
+            }
+        return messages, product
+
+    def _append_args(self, session_id, messages, tools):
+        encoded = [json.dumps(m) for m in messages]
+        encoded_tools = {name: json.dumps(payload) for name, payload in (tools or {}).items()}
+        keys = [self.messages_key(session_id), self.product_key(session_id),
+                self.last_message_key(session_id), self.tools_key(session_id)]
+        return keys, encoded, encoded_tools, datetime.now().timestamp()
+
+    def _queue_append(self, pipe, keys, encoded, encoded_tools, now):
+        if encoded:
+            pipe.rpush(keys[0], *encoded)
+        pipe.ltrim(keys[0], -self.max_messages, -1)
+        if encoded_tools:
+            pipe.hset(keys[3], mapping=encoded_tools)
+        pipe.expire(keys[0], self.ttl)
+        pipe.expire(keys[1], self.ttl)
+        pipe.expire(keys[3], self.ttl)
+        pipe.set(keys[2], now)
+
+    def _script_args(self, encoded, encoded_tools, now):
+        tools_arg = json.dumps(encoded_tools) if encoded_tools else ''
+        return [self.max_messages, self.ttl, now, tools_arg] + encoded
+
+    def _queue_set_product(self, pipe, session_id, description, product_details):
+        pipe.hset(self.product_key(session_id), mapping={
+            "description": json.dumps(description),
+            "product_details": json.dumps(product_details),
+        })
+        pipe.expire(self.product_key(session_id), self.ttl)
+        pipe.expire(self.messages_key(session_id), self.ttl)
+        pipe.expire(self.tools_key(session_id), self.ttl)
+        pipe.set(self.last_message_key(session_id), datetime.now().timestamp())
+
+    def _queue_set_description(self, pipe, session_id, description):
+        pipe.hset(self.product_key(session_id), "description", json.dumps(description))
+        pipe.expire(self.product_key(session_id), self.ttl)
+
+    def load(self, session_id):
+        """Return (messages, product) where product is None if no image was seen."""
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            self._queue_load(pipe, session_id)
+            return self._decode_load(*pipe.execute())
+
+    def append(self, session_id, messages, tools=None):
+        """Push this turn's messages and overwrite the given tool payloads."""
+        keys, encoded, encoded_tools, now = self._append_args(session_id, messages, tools)
+        if self._append_script is not None:
+            self._append_script(keys=keys, args=self._script_args(encoded, encoded_tools, now))
+            return
+        with self.redis_client.pipeline() as pipe:
+            self._queue_append(pipe, keys, encoded, encoded_tools, now)
+            pipe.execute()
+
+    def tool_payload(self, session_id, name):
+        raw = self.redis_client.hget(self.tools_key(session_id), name)
+        return json.loads(raw) if raw is not None else None
+
+    def set_product(self, session_id, description, product_details):
+        with self.redis_client.pipeline() as pipe:
+            self._queue_set_product(pipe, session_id, description, product_details)
+            pipe.execute()
+
+    def set_description(self, session_id, description):
+        """Fill in the description of the product already stored for the session."""
+        with self.redis_client.pipeline() as pipe:
+            self._queue_set_description(pipe, session_id, description)
+            pipe.execute()
+
+
+class AsyncSessionStore(SessionStore):
+    """SessionStore over a redis.asyncio client; same keys and commands."""
+
+    async def load(self, session_id):
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            self._queue_load(pipe, session_id)
+            return self._decode_load(*await pipe.execute())
+
+    async def append(self, session_id, messages, tools=None):
+        keys, encoded, encoded_tools, now = self._append_args(session_id, messages, tools)
+        if self._append_script is not None:
+            await self._append_script(keys=keys, args=self._script_args(encoded, encoded_tools, now))
+            return
+        async with self.redis_client.pipeline() as pipe:
+            self._queue_append(pipe, keys, encoded, encoded_tools, now)
+            await pipe.execute()
+
+    async def tool_payload(self, session_id, name):
+        raw = await self.redis_client.hget(self.tools_key(session_id), name)
+        return json.loads(raw) if raw is not None else None
+
+    async def set_product(self, session_id, description, product_details):
+        async with self.redis_client.pipeline() as pipe:
+            self._queue_set_product(pipe, session_id, description, product_details)
+            await pipe.execute()
+
+    async def set_description(self, session_id, description):
+        async with self.redis_client.pipeline() as pipe:
+            self._queue_set_description(pipe, session_id, description)
+            await pipe.execute()
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from langgraph.graph import MessagesState
-from typing import Optional, Literal, List
+from typing import Optional, Literal, List, Union
 from datetime import datetime
 from typing_extensions import Literal, Dict
 
@@ -11,6 +11,23 @@ class VlmResponse(BaseModel):
     product_details : Dict
 
 
+# what each vision prompt must return; other keys are kept as they come
+class ProductDetails(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    # wiki and links search on it
+    product : str = Field(min_length=1)
+
+
+class ProductDescription(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    product_name : str = Field(min_length=1)
+
+
+class CombinedVision(BaseModel):
+    product_details : ProductDetails
+    description : ProductDescription
+
+
 class RouterResponse(BaseModel):
     tool_usage: Literal["Wiki_tool", "links_tool", "no_tool"] = Field(description="The tool to be used by the LLM based on user's request. It must be one of: 'links_tool' or 'Wiki_tool'")
 
@@ -23,16 +40,23 @@ class State(BaseModel):
     """Simple state object."""
     # user
     session_id : str
-    msg : List[str]
+    # chat messages; a links turn ends with the raw search results
+    msg : List[Union[str, List[Dict]]]
+    # number of leading msg entries loaded from memory by injection_node
+    history_len : int = 0
 
     input_type: Optional[Literal["image", "text"]]
 
     content : Optional[str] = None
+    # BLOB_STORE key of the uploaded image
+    image_key : Optional[str] = None
+    # base64 upload from callers without the blob store; vision_node moves it there
     image_bytes : Optional[str] = None
+    image_mime : str = "image/jpeg"
     # context
     product_info : Optional[VlmResponse] = None
     # routing
-    workflow : Optional[RouterResponse] = None
+    workflow : Optional[Literal["Wiki_tool", "links_tool", "no_tool"]] = None
     routing : Optional[Wiki_routing] = None
     # llm resps
     wiki_response : Optional[str] = None
@@ -0,0 +1,166 @@
+import difflib
+import os
+import re
+
+STRUCTURED_QA = os.getenv("STRUCTURED_QA", "0") == "1"
+# how close a misspelt word or product key has to be to count
+QA_FUZZY_CUTOFF = float(os.getenv("QA_FUZZY_CUTOFF", "0.8"))
+# shorter words are not spelling-corrected, "shape" is one letter from "shade"
+QA_FUZZY_MIN_LENGTH = int(os.getenv("QA_FUZZY_MIN_LENGTH", "6"))
+# longer questions are rarely plain lookups
+QA_MAX_WORDS = int(os.getenv("QA_MAX_WORDS", "10"))
+
+# intent -> (cue words and phrases, product keys that answer it, in order of preference)
+INTENTS = {
+    "brand": (["brand", "manufacturer", "maker", "company", "made by", "who makes", "who made"],
+              ["brand", "manufacturer", "make"]),
+    "material": (["material", "materials", "fabric", "made of", "made from", "made out of"],
+                 ["material", "materials", "fabric"]),
+    "color": (["color", "colour", "colors", "colours", "shade"],
+              ["color", "colour", "colors", "colours"]),
+    "style": (["style", "design", "look"],
+              ["style", "design", "type"]),
+    "quality": (["quality"],
+                ["quality"]),
+    "features": (["features", "feature", "specs", "specifications"],
+                 ["features", "key_features", "specifications"]),
+    "size": (["size", "sizes", "dimensions"],
+             ["size", "dimensions"]),
+    "category": (["category", "kind of product", "type of product"],
+                 ["category"]),
+    "name": (["name", "called", "model"],
+             ["product_name", "model", "name"]),
+    "uses": (["used for", "use it for", "uses", "purpose", "what is it for", "what's it for"],
+             ["common_uses", "uses"]),
+    "audience": (["who uses", "who is it for", "who would use", "who might use", "who should", "suitable for"],
+                 ["who_might_use_this"]),
+    "alternatives": (["alternative", "alternatives", "similar", "related", "instead"],
+                     ["related_products_or_alternatives", "alternatives"]),
+}
+# questions that want an opinion, a comparison or a price, not a stored field
+OPEN_CUES = {"good", "better", "best", "worth", "compare", "vs", "versus", "recommend", "why", "how",
+             "price", "cost", "cheap", "buy", "should", "durable", "last", "wash", "care", "tell", "explain",
+             "history", "more", "think", "popular"}
+# a lookup starts with one of these, or is a bare noun ("brand?")
+WH_WORDS = {"what", "what's", "whats", "which", "who", "who's", "whos", "list", "show", "any"}
+# yes/no questions ("is it made of leather?") are checks, not lookups
+YES_NO_WORDS = {"is", "are", "was", "were", "am", "can", "could", "does", "do", "did", "will", "would",
+                "has", "have", "had", "may", "might", "shall", "isn't", "doesn't", "can't"}
+# words a lookup may carry besides its cue; any other word means more is being asked
+FILLER_WORDS = {"it", "its", "it's", "this", "that", "these", "those", "the", "a", "an", "is", "are", "was",
+                "of", "for", "by", "me", "some", "like", "made", "used", "does", "have", "has", "please",
+                "product", "products", "item", "items", "thing", "one", "exactly", "again"}
+TEMPLATES = {
+    "brand": "It is made by {value}.",
+    "material": "It is made of {value}.",
+    "color": "It is {value}.",
+    "uses": "It is commonly used for: {value}.",
+    "audience": "It suits: {value}.",
+    "alternatives": "Related products and alternatives: {value}.",
+    "name": "It is the {value}.",
+    "features": "Its features: {value}.",
+    "category": "It falls under {value}.",
+}
+
+
+def _words(text: str):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def _format(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(v) for v in value if v not in (None, ""))
+    if isinstance(value, dict):
+        return ", ".join(f"{k}: {v}" for k, v in value.items() if v not in (None, ""))
+    return str(value)
+
+
+class StructuredQA:
+    """Local answers to attribute follow-ups ("what brand is it?").
+
+    Only plain lookups are answered: a wh-question (or a bare noun) whose
+    words are the cues of one intent from INTENTS plus FILLER_WORDS, e.g.
+    "what brand is it?". Yes/no questions, open-ended ones and any question
+    with another content word ("what is this brand known for?") return None
+    so the caller asks the LLM, as does a product lacking the field. The value
+    is the first matching key of product_details and then description (exact
+    key, else difflib).
+    """
+
+    def __init__(self, cutoff=QA_FUZZY_CUTOFF, max_words=QA_MAX_WORDS, fuzzy_min_length=QA_FUZZY_MIN_LENGTH):
+        self.cutoff = cutoff
+        self.max_words = max_words
+        self.fuzzy_min_length = fuzzy_min_length
+        self.cue_words = {}
+        self.cue_phrases = []
+        for intent, (cues, _) in INTENTS.items():
+            for cue in cues:
+                if " " in cue or "'" in cue:
+                    self.cue_phrases.append((cue, intent))
+                else:
+                    self.cue_words[cue] = intent
+        # longest first, so "who is it for" is taken before anything inside it
+        self.cue_phrases.sort(key=lambda item: -len(item[0]))
+        self.answered = 0
+        self.fallback = 0
+
+    def intent(self, question: str):
+        words = _words(question)
+        if not words or len(words) > self.max_words or OPEN_CUES.intersection(words) or words[0] in YES_NO_WORDS:
+            return None
+        text = " ".join(words)
+        found = set()
+        for phrase, intent in self.cue_phrases:
+            pattern = rf"\b{re.escape(phrase)}\b"
+            if re.search(pattern, text):
+                found.add(intent)
+                text = re.sub(pattern, " ", text)
+        rest = text.split()
+        if rest and rest[0] in WH_WORDS:
+            rest = rest[1:]
+        for word in rest:
+            if word in self.cue_words:
+                found.add(self.cue_words[word])
+                continue
+            if word in FILLER_WORDS:
+                continue
+            close = None
+            if len(word) >= self.fuzzy_min_length:
+                close = difflib.get_close_matches(word, self.cue_words, n=1, cutoff=self.cutoff)
+            if not close:
+                # a word no cue explains: the question asks for more than the field
+                return None
+            found.add(self.cue_words[close[0]])
+        return found.pop() if len(found) == 1 else None
+
+    def lookup(self, intent: str, product: dict):
+        keys = {str(k).lower().replace(" ", "_"): k for k in product}
+        for wanted in INTENTS[intent][1]:
+            key = keys.get(wanted)
+            if key is None:
+                close = difflib.get_close_matches(wanted, keys, n=1, cutoff=self.cutoff)
+                key = keys[close[0]] if close else None
+            if key is not None and product[key] not in (None, "", [], {}):
+                return product[key]
+        return None
+
+    def answer(self, question: str, product_details: dict, description: dict = None):
+        intent = self.intent(question) if isinstance(question, str) else None
+        value = None
+        if intent is not None:
+            for product in (product_details, description or {}):
+                value = self.lookup(intent, product)
+                if value is not None:
+                    break
+        if value is None:
+            self.fallback += 1
+            return None
+        self.answered += 1
+        template = TEMPLATES.get(intent, f"Its {intent}: {{value}}.")
+        return template.format(value=_format(value))
+
+    def stats(self):
+        return {"answered": self.answered, "llm_fallback": self.fallback}
+
+
+QA = StructuredQA()
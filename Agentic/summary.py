@@ -0,0 +1,48 @@
+import os
+
+# how the reply to an image upload is written:
+#   llm      the chat model restates product_details (CHATBOT_SYSTEM_DETECTION_PROMPT)
+#   local    render_detection builds it from the template below, no LLM call
+#   enhance  local reply right away, the LLM rewrite is stored for the session
+#            as the "summary" tool payload once it is done
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "llm")
+
+FIELD_EMOJIS = {
+    "brand": "🏷️",
+    "style": "✨",
+    "type": "✨",
+    "material": "🧵",
+    "color": "🎨",
+    "colour": "🎨",
+    "pattern": "🎨",
+    "quality": "⭐",
+    "features": "⚙️",
+    "size": "📏",
+    "price": "💰",
+    "condition": "🔍",
+}
+DEFAULT_EMOJI = "🔹"
+FOLLOW_UP = ("💬 Ask me anything about it, or ask for similar product suggestions "
+             "and shopping links 🛒")
+
+
+def _format_value(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(v) for v in value if v not in (None, ""))
+    if isinstance(value, dict):
+        return ", ".join(f"{k}: {v}" for k, v in value.items() if v not in (None, ""))
+    return str(value)
+
+
+def render_detection(product_details: dict) -> str:
+    """Markdown detection reply for product_details, the local stand-in for the LLM summary."""
+    product = str(product_details.get("product") or "product")
+    lines = [f"🛍️ Here is what I found: **{product.title()}**", ""]
+    for key, value in product_details.items():
+        if key == "product" or value in (None, "", [], {}):
+            continue
+        label = key.replace("_", " ").capitalize()
+        lines.append(f"{FIELD_EMOJIS.get(key.lower(), DEFAULT_EMOJI)} **{label}:** {_format_value(value)}")
+    lines += ["", FOLLOW_UP]
+    # two trailing spaces keep the lines apart in markdown
+    return "  \n".join(lines)
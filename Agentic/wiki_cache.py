@@ -0,0 +1,162 @@
+"""Persistent cache for Wikipedia lookups made by wiki_node.
+
+Results are keyed by the normalized product name and stored in SQLite with
+a TTL, fronted by an in-process LRU so repeat questions about the same
+product never leave the process.
+
+Pre-fetch the most common product categories with:
+    python Agentic/wiki_cache.py warm --top 20
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from cache import TTLCache, normalize_query
+from fakes import FAKE
+
+# fake Wikipedia text never goes into the real on-disk cache
+WIKI_CACHE_PATH = os.getenv("WIKI_CACHE_PATH", ":memory:" if FAKE else os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "wiki_cache.sqlite3"))
+WIKI_CACHE_TTL = int(os.getenv("WIKI_CACHE_TTL", str(7 * 24 * 3600)))
+# what WikipediaQueryRun returns on a miss; not cached, the next turn asks again
+NO_RESULT = "No good Wikipedia Search Result was found"
+
+# products people photograph most often, used by the warm-up command
+DEFAULT_CATEGORIES = [
+    "t-shirt", "shirt", "jeans", "dress", "shoe", "sneaker", "watch", "bag", "backpack", "phone",
+    "headphones", "laptop", "bike", "fabric", "sunglasses", "jacket", "bottle", "chair", "lamp", "camera",
+    "perfume", "wallet", "cap", "saree", "kurta", "earphones", "keyboard", "mouse", "speaker", "mug",
+]
+
+
+class WikiCache:
+    def __init__(self, path=WIKI_CACHE_PATH, ttl=WIKI_CACHE_TTL, memory_size=1024):
+        self.path = path
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize=memory_size, ttl=ttl)
+        self._conn = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS wiki_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, query):
+        key = normalize_query(query)
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        return self._db_get(key)
+
+    async def aget(self, query):
+        """get() for async callers, the SQLite read runs off the event loop."""
+        key = normalize_query(query)
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        return await asyncio.to_thread(self._db_get, key)
+
+    def _db_get(self, key):
+        with self._lock:
+            row = self._db().execute(
+                "SELECT value FROM wiki_cache WHERE key = ? AND created > ?", (key, time.time() - self.ttl)
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.memory.set(key, row[0])
+        return row[0]
+
+    def set(self, query, value):
+        """Store value for query; misses (NO_RESULT) are not kept, like SearchCache skips errors."""
+        if not value or value.strip() == NO_RESULT:
+            return
+        key = normalize_query(query)
+        self.memory.set(key, value)
+        self._db_set(key, value)
+
+    async def aset(self, query, value):
+        """set() for async callers, the SQLite write and commit run off the event loop."""
+        if not value or value.strip() == NO_RESULT:
+            return
+        key = normalize_query(query)
+        self.memory.set(key, value)
+        await asyncio.to_thread(self._db_set, key, value)
+
+    def _db_set(self, key, value):
+        with self._lock:
+            db = self._db()
+            db.execute("INSERT OR REPLACE INTO wiki_cache (key, value, created) VALUES (?, ?, ?)", (key, value, time.time()))
+            db.commit()
+
+    def lookup(self, query, fetch):
+        """Cached value for query, calling fetch(query) and storing the result on a miss."""
+        value = self.get(query)
+        if value is None:
+            value = fetch(query)
+            self.set(query, value)
+        return value
+
+    def purge_expired(self):
+        with self._lock:
+            db = self._db()
+            deleted = db.execute("DELETE FROM wiki_cache WHERE created <= ?", (time.time() - self.ttl,)).rowcount
+            db.commit()
+        return deleted
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "memory_size": len(self.memory)}
+
+
+WIKI_CACHE = WikiCache()
+
+
+def warm(categories, fetch, cache=WIKI_CACHE):
+    fetched = 0
+    for category in categories:
+        if cache.get(category) is None:
+            value = fetch(category)
+            cache.set(category, value)
+            fetched += 1
+            print(f"fetched {category}" if value != NO_RESULT else f"no result for {category}")
+    return fetched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    warm_cmd = sub.add_parser("warm", help="pre-fetch Wikipedia data for common product categories")
+    warm_cmd.add_argument("--top", type=int, default=len(DEFAULT_CATEGORIES))
+    warm_cmd.add_argument("--categories", help="file with one category per line, most common first")
+    sub.add_parser("purge", help="delete expired entries")
+    args = parser.parse_args()
+
+    if args.command == "purge":
+        print(f"deleted {WIKI_CACHE.purge_expired()} expired entries")
+        return
+    categories = DEFAULT_CATEGORIES
+    if args.categories:
+        with open(args.categories) as f:
+            categories = [line.strip() for line in f if line.strip()]
+    from helper import get_wiki_tool
+    fetched = warm(categories[:args.top], get_wiki_tool().invoke)
+    print(f"warmed {fetched} new entries into {WIKI_CACHE.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""Offline Wikipedia index, answering wiki lookups without the live API.
+
+Build it from a Wikipedia abstracts dump or from any JSONL of articles
+({"title": ..., "text": ...}, "abstract" or "extract" also work):
+    python Agentic/wiki_index.py build enwiki-latest-abstract.xml.gz
+    python Agentic/wiki_index.py build articles.jsonl --out /data/wiki_index.sqlite3
+    python Agentic/wiki_index.py search "t-shirt"
+
+then set WIKI_INDEX_PATH to the file. get_wiki_tool() and awiki_search()
+answer from the index (SQLite FTS5, BM25 ranked, title weighted) and only
+call Wikipedia when nothing matches.
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from wiki_cache import NO_RESULT
+
+WIKI_INDEX_PATH = os.getenv("WIKI_INDEX_PATH")
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "wiki_index.sqlite3")
+# BM25 column weights: a match in the title counts this much more than one in the text
+WIKI_INDEX_TITLE_WEIGHT = float(os.getenv("WIKI_INDEX_TITLE_WEIGHT", "10"))
+STOPWORDS = {"a", "an", "the", "is", "are", "was", "what", "who", "which", "of", "for", "to", "in", "on",
+             "and", "or", "about", "tell", "me", "it", "this", "that", "how", "does", "do"}
+BATCH_SIZE = 10000
+
+
+def read_abstracts(path):
+    """(title, text) pairs from an enwiki-*-abstract.xml dump, gzipped or not."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        title = None
+        for event, elem in ET.iterparse(f, events=("end",)):
+            if elem.tag == "title":
+                title = (elem.text or "").removeprefix("Wikipedia: ")
+            elif elem.tag == "abstract":
+                text = (elem.text or "").strip()
+                # disambiguation and list pages come with an empty or "|" abstract
+                if title and len(text) > 1:
+                    yield title, text
+            elif elem.tag == "doc":
+                title = None
+                elem.clear()
+
+
+def read_jsonl(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            text = row.get("text") or row.get("abstract") or row.get("extract")
+            if row.get("title") and text:
+                yield row["title"], text
+
+
+def build(articles, path):
+    """Write (title, text) pairs into a fresh FTS5 index at path. Returns the article count."""
+    if os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    # a half-written index is rebuilt anyway, no need to journal it
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("CREATE VIRTUAL TABLE articles USING fts5(title, text, tokenize = 'porter unicode61')")
+    count = 0
+    batch = []
+    for article in articles:
+        batch.append(article)
+        if len(batch) >= BATCH_SIZE:
+            conn.executemany("INSERT INTO articles (title, text) VALUES (?, ?)", batch)
+            count += len(batch)
+            batch = []
+    conn.executemany("INSERT INTO articles (title, text) VALUES (?, ?)", batch)
+    count += len(batch)
+    conn.commit()
+    # merge the b-tree segments so lookups touch as few pages as possible
+    conn.execute("INSERT INTO articles (articles) VALUES ('optimize')")
+    conn.commit()
+    conn.close()
+    return count
+
+
+def match_expressions(query):
+    """FTS5 queries to try in order: every word in the title, then every word anywhere.
+
+    The title pass comes first because it is both the better answer and a
+    small match set; a common word can match a large part of the text
+    column and BM25 has to score every match. There is no any-word pass:
+    in a full dump one common word ("green") matches something for almost
+    any query, and a page that only shares it is a miss for the live API.
+    """
+    words = re.findall(r"\w+", query.lower())
+    words = [w for w in words if w not in STOPWORDS] or words
+    if not words:
+        return []
+    every = " AND ".join(f'"{w}"' for w in words)
+    return [f"title : ({every})", every]
+
+
+class WikiIndex:
+    """Read side of the index; one connection shared under a lock, like WikiCache."""
+
+    def __init__(self, path=WIKI_INDEX_PATH, title_weight=WIKI_INDEX_TITLE_WEIGHT):
+        self.path = path
+        self.title_weight = title_weight
+        self._conn = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        return self._conn
+
+    def search(self, query, k=2):
+        """[(title, text)] of the k best BM25 matches, [] if nothing matches."""
+        with self._lock:
+            db = self._db()
+            for expression in match_expressions(query):
+                rows = db.execute(
+                    "SELECT title, text FROM articles WHERE articles MATCH ? ORDER BY bm25(articles, ?, 1.0) LIMIT ?",
+                    (expression, self.title_weight, k),
+                ).fetchall()
+                if rows:
+                    return rows
+        return []
+
+    def lookup(self, query, top_k_results=2, doc_content_chars_max=2000):
+        """Text in WikipediaAPIWrapper's format, or None on a miss."""
+        rows = self.search(query, top_k_results)
+        if not rows:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return "\n\n".join(f"Page: {title}\nSummary: {text}" for title, text in rows)[:doc_content_chars_max]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+WIKI_INDEX = WikiIndex(WIKI_INDEX_PATH) if WIKI_INDEX_PATH else None
+
+
+class WikiIndexTool:
+    """WikipediaQueryRun stand-in: the local index first, fallback.invoke on a miss."""
+
+    def __init__(self, index, fallback=None, top_k_results=2, doc_content_chars_max=2000):
+        self.index = index
+        self.fallback = fallback
+        self.top_k_results = top_k_results
+        self.doc_content_chars_max = doc_content_chars_max
+
+    def invoke(self, query):
+        text = self.index.lookup(query, self.top_k_results, self.doc_content_chars_max)
+        if text is not None:
+            return text
+        if self.fallback is None:
+            return NO_RESULT
+        return self.fallback.invoke(query)
+
+    run = invoke
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="index an abstracts XML dump or an articles JSONL")
+    build_cmd.add_argument("source")
+    build_cmd.add_argument("--out", default=WIKI_INDEX_PATH or DEFAULT_INDEX_PATH)
+    search_cmd = sub.add_parser("search", help="query an index")
+    search_cmd.add_argument("query")
+    search_cmd.add_argument("--index", default=WIKI_INDEX_PATH or DEFAULT_INDEX_PATH)
+    search_cmd.add_argument("-k", type=int, default=2)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        reader = read_jsonl if ".jsonl" in args.source else read_abstracts
+        start = time.perf_counter()
+        count = build(reader(args.source), args.out)
+        print(f"indexed {count} articles into {args.out} in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(args.out) / 1024 / 1024:.1f}MB)")
+        return
+    index = WikiIndex(args.index)
+    start = time.perf_counter()
+    text = index.lookup(args.query, args.k)
+    print(text if text is not None else NO_RESULT)
+    print(f"\n({(time.perf_counter() - start) * 1000:.2f}ms)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Throughput of the sync graph on a thread pool vs the asyncio graph.
+
+Run from the repo root (needs fakeredis):
+    python benchmarks/bench_async.py --latency 0.2 --threads 16
+
+Every backend is stubbed with a fixed delay: the chat model and router
+chain sleep for --latency, Wikipedia and Tavily for half of it, and redis
+is fakeredis. Each simulated session sends one text turn about its own
+product (so the wiki / search caches miss), cycling through the chat,
+links and Wikipedia routes. The sync graph runs on a --threads pool, the
+way a threaded web server would serve it; the async graph runs every
+session as a task on one event loop.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Agentic")))
+os.environ.setdefault("GROQ_API", "bench")
+os.environ.setdefault("WIKI_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "wiki_cache.sqlite3"))
+
+import fakeredis
+from langchain_core.messages import AIMessage
+
+import app_with_memory
+import async_app
+from app_with_memory import Shoppingass
+from async_app import AsyncShoppingass
+from latency import percentile
+from states import State
+
+# the fast router sends the first two to links / no_tool locally, the last one needs the router chain
+QUESTIONS = ["hi there", "where can I buy this?", "is this fabric good for summer?"]
+
+
+class StubChat:
+    def __init__(self, latency):
+        self.latency = latency
+
+    @staticmethod
+    def reply(messages):
+        # the context check says NOT FOUND so the Wikipedia route runs end to end
+        return AIMessage(content="NOT FOUND" if "### CONTEXT ###" in str(messages) else "a stubbed answer")
+
+    def invoke(self, messages):
+        time.sleep(self.latency)
+        return self.reply(messages)
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self.latency)
+        return self.reply(messages)
+
+
+class StubRouter:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def invoke(self, inputs):
+        time.sleep(self.latency)
+        return SimpleNamespace(tool_usage="Wiki_tool")
+
+    async def ainvoke(self, inputs):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(tool_usage="Wiki_tool")
+
+
+def install_stubs(latency):
+    chat, router = StubChat(latency), StubRouter(latency)
+
+    def wiki(query):
+        time.sleep(latency / 2)
+        return f"Page: {query}\nSummary: stubbed article"
+
+    def search(query):
+        time.sleep(latency / 2)
+        return [{"title": query, "url": "https://example.com", "content": "stub"}]
+
+    async def awiki(query, *args, **kwargs):
+        await asyncio.sleep(latency / 2)
+        return f"Page: {query}\nSummary: stubbed article"
+
+    async def asearch(query, max_results=10):
+        await asyncio.sleep(latency / 2)
+        return [{"title": query, "url": "https://example.com", "content": "stub"}]
+
+    for module in (app_with_memory, async_app):
+        module.get_llm = lambda *a, **k: chat
+        module.get_router_chain = lambda *a, **k: router
+    app_with_memory.get_wiki_tool = lambda *a, **k: SimpleNamespace(invoke=wiki)
+    app_with_memory.get_search_tool = lambda *a, **k: SimpleNamespace(invoke=search)
+    async_app.awiki_search = awiki
+    async_app.asearch_links = asearch
+    app_with_memory.RedisClient._instance = fakeredis.FakeRedis(decode_responses=True)
+
+
+def turn(level, i):
+    session_id = f"bench-{level}-{i}"
+    return session_id, f"product {level}-{i}", QUESTIONS[i % len(QUESTIONS)]
+
+
+def run_sync(sessions, threads):
+    agent = Shoppingass.get_instance()
+    turns = [turn(sessions, i) for i in range(sessions)]
+    for session_id, product, _ in turns:
+        agent.session_store.set_product(session_id, {"product_name": product}, {"product": product})
+
+    def one(args):
+        session_id, _, question = args
+        agent.run(State(session_id=session_id, msg=[question], input_type="text"))
+        # measured from the start of the batch so time queued for a thread counts
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one, turns))
+    return time.perf_counter() - start, latencies
+
+
+async def run_async(sessions):
+    # a fresh client per event loop
+    async_app.AsyncRedisClient._instance = fakeredis.FakeAsyncRedis(decode_responses=True)
+    AsyncShoppingass._instance = None
+    agent = AsyncShoppingass.get_instance()
+    turns = [turn(sessions, i) for i in range(sessions)]
+    for session_id, product, _ in turns:
+        await agent.session_store.set_product(session_id, {"product_name": product}, {"product": product})
+
+    async def one(session_id, question):
+        await agent.arun(State(session_id=session_id, msg=[question], input_type="text"))
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(session_id, question) for session_id, _, question in turns))
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per stubbed LLM call")
+    parser.add_argument("--threads", type=int, default=16, help="thread pool size for the sync graph")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50, 100, 200])
+    args = parser.parse_args()
+    install_stubs(args.latency)
+
+    # keep the graphs' debug prints out of the table
+    stdout = sys.stdout
+    print(f"{'sessions':>8} | {'sync turns/s':>12} {'sync p50 ms':>11} | {'async turns/s':>13} {'async p50 ms':>12}")
+    for sessions in args.sessions:
+        sys.stdout = open(os.devnull, "w")
+        try:
+            sync_s, sync_lat = run_sync(sessions, args.threads)
+            async_s, async_lat = asyncio.run(run_async(sessions))
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        print(f"{sessions:>8} | {sessions / sync_s:>12.1f} {percentile(sorted(sync_lat), 50) * 1000:>11.0f}"
+              f" | {sessions / async_s:>13.1f} {percentile(sorted(async_lat), 50) * 1000:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
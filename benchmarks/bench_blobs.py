@@ -0,0 +1,105 @@
+"""Memory held per image turn and per chat session: base64 in State vs blob keys.
+
+Run from the repo root:
+    python benchmarks/bench_blobs.py --uploads 20
+
+The vision node runs against an instant stub client under tracemalloc.
+"before" rebuilds the old path: the base64 string is carried in State and
+a fresh data URL is formatted for each prompt. "after" is the current node:
+State carries the BLOB_STORE key and the data URL is encoded once and
+shared by both prompts. The session figures are what the Streamlit chat
+history holds after --uploads images: the base64 string per upload before,
+a 64-character key after.
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import tracemalloc
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "Agentic"))
+os.environ.setdefault("GROQ_API", "bench")
+
+import app_with_memory
+from app_with_memory import Shoppingass, VISION_PROMPTS
+from blob_store import BLOB_STORE
+from image_utils import prepare_image
+from states import State
+
+SAMPLE = os.path.join(ROOT, "testing", "temp_D92760A4-ECB4-49BC-8CB3-025AB6B4DBF4.jpg")
+
+
+class InstantCompletions:
+    def create(self, model, messages, **kwargs):
+        content = {"product": "t-shirt"} if "product_name" not in messages[0]["content"][0]["text"] else {"product_name": "T-Shirt"}
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(content)))])
+
+
+def old_vision(agent, state):
+    # the pre-blob-store behaviour, kept here as the baseline
+    results = {}
+    for name, prompt in VISION_PROMPTS.items():
+        image_data_url = f"data:image/jpeg;base64,{state.image_bytes}"
+        client = app_with_memory.get_llm_client()
+        completion = client.chat.completions.create(
+            model="bench", messages=[{"role": "user", "content": [
+                {"type": "text", "text": prompt}, {"type": "image_url", "image_url": {"url": image_data_url}}]}])
+        results[name] = agent.parse_vision(completion.choices[0].message.content)["result"]
+    return results
+
+
+def traced(fn):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=20)
+    args = parser.parse_args()
+
+    app_with_memory.get_llm_client = lambda *a, **k: SimpleNamespace(chat=SimpleNamespace(completions=InstantCompletions()))
+    # the stub answers with whole completions
+    app_with_memory.VISION_STREAM = False
+    agent = Shoppingass.__new__(Shoppingass)
+    with open(SAMPLE, "rb") as f:
+        data, mime = prepare_image(f.read())
+
+    def before():
+        # upload -> base64 str -> State -> one data URL per prompt
+        state = State(session_id="bench", msg=[], input_type="image", image_bytes=base64.b64encode(data).decode())
+        old_vision(agent, state)
+
+    def after():
+        # upload -> blob store -> key in State -> one shared data URL
+        app_with_memory.VISION_CACHE.local.clear()
+        state = State(session_id="bench", msg=[], input_type="image", image_key=BLOB_STORE.put(data, mime))
+        agent.vision_node(state)
+
+    sys.stdout = open(os.devnull, "w")
+    try:
+        before(), after()  # warm imports and pydantic
+        BLOB_STORE.clear()
+        before_peak = traced(before)
+        after_peak = traced(after)
+    finally:
+        sys.stdout.close()
+        sys.stdout = sys.__stdout__
+
+    b64_len = len(base64.b64encode(data))
+    print(f"image: {len(data) / 1024:.1f}KB raw, {b64_len / 1024:.1f}KB base64")
+    print(f"peak memory in one image turn:  before {before_peak / 1024:.1f}KB   after {after_peak / 1024:.1f}KB")
+    print(f"chat history after {args.uploads} uploads: before {args.uploads * b64_len / 1024:.1f}KB   "
+          f"after {args.uploads * 64 / 1024:.1f}KB (images live in the blob store, capped at "
+          f"{BLOB_STORE.max_bytes // (1024 * 1024)}MB for the whole process)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Count client/chain constructions across simulated turns.
+
+Run from the repo root:
+    python benchmarks/bench_clients.py --turns 100
+
+Every node asks helper.py for its client on every turn; with the pool in
+client_pool.py each kind must be built exactly once per model. Exits
+non-zero if anything is rebuilt.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Agentic")))
+os.environ.setdefault("GROQ_API", "bench")
+
+from langchain_core.runnables import RunnableLambda
+
+import client_pool
+import helper
+
+built = Counter()
+
+
+class CountingChatGroq:
+    def __init__(self, **kwargs):
+        built["ChatGroq"] += 1
+        self.model = kwargs["model"]
+
+    def with_structured_output(self, schema):
+        built["structured_output"] += 1
+        return RunnableLambda(lambda _: schema(tool_usage="no_tool"))
+
+
+class CountingGroq:
+    def __init__(self, **kwargs):
+        built["Groq"] += 1
+
+
+def simulate_turn():
+    # one text turn: router, context/chatbot nodes; one vision call
+    helper.get_router_chain()
+    helper.get_llm()
+    helper.get_llm()
+    helper.get_llm_client()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=100)
+    args = parser.parse_args()
+
+    # the live getters are what is being counted, even under AGENT_BACKEND=fake
+    helper.FAKE = False
+    helper.ChatGroq = CountingChatGroq
+    helper.Groq = CountingGroq
+    client_pool.reset_pool()
+
+    start = time.perf_counter()
+    for _ in range(args.turns):
+        simulate_turn()
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.turns} turns in {elapsed * 1000:.2f}ms")
+    print(f"constructions: {dict(built)}")
+    print(f"pool entries:  {dict(client_pool.constructions)}")
+    expected = {"ChatGroq": 1, "structured_output": 1, "Groq": 1}
+    if dict(built) != expected:
+        sys.exit(f"expected {expected}, got {dict(built)}")
+    print("OK: every client and chain was built once")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Cost of building the agent graph per message vs once per process.
+
+Run from the repo root:
+    python benchmarks/bench_graph.py --runs 50
+
+Only construction is measured; no LLM, redis or network calls are made
+(the redis client connects lazily).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Agentic")))
+os.environ.setdefault("GROQ_API", "bench")
+
+from app_with_memory import Shoppingass, get_graph
+
+
+def per_call(fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    get_graph()
+    startup = time.perf_counter() - start
+
+    per_message = per_call(lambda: Shoppingass().graph, args.runs)
+    shared = per_call(get_graph, args.runs)
+    print(f"first get_graph() (startup):      {startup * 1000:.2f}ms")
+    print(f"Shoppingass() per message (before): {per_message * 1000:.2f}ms")
+    print(f"get_graph() per message (after):    {shared * 1e6:.2f}us")
+    print(f"saved per request:                  {(per_message - shared) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""LLM calls per image turn with and without router_node on the image path.
+
+Run from the repo root against the offline fakes:
+    python benchmarks/bench_graph_pruning.py --turns 10
+
+First the EDGE_READS declarations in edges.py are checked against the edge
+functions: every State field an edge is declared not to read for an input
+type is varied over its values and the edge must route the same way. Then
+image turns go through two graphs, "before" with router_node wired after
+vision_node as it used to be and "after" as compile_graph builds it now,
+and the chat-model calls of each turn are counted through LangChain
+callbacks. Vision answers are cached first so only the router differs.
+Exits non-zero if a declaration is wrong or the image turn does
+not save exactly the router call.
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "Agentic"))
+
+# values each routing field can take, for checking the declarations
+FIELD_VALUES = {"workflow": [None, "Wiki_tool", "links_tool", "no_tool"]}
+
+
+def check_reads(edge, reads, make_state):
+    """Fields declared unread for an input type must not change the route."""
+    errors = []
+    for input_type, fields in reads.items():
+        for field, values in FIELD_VALUES.items():
+            if field in fields:
+                continue
+            for with_product in (True, False):
+                routes = {edge(make_state(input_type, with_product, **{field: value})) for value in values}
+                if len(routes) > 1:
+                    errors.append(f"{edge.__name__} reads {field} on {input_type} turns: {sorted(routes)}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+    os.environ["AGENT_BACKEND"] = "fake"
+
+    from langchain_core.callbacks import BaseCallbackHandler
+    import app_with_memory
+    from app_with_memory import Shoppingass
+    from blob_store import BLOB_STORE
+    from edges import EDGE_READS
+    from image_utils import prepare_image
+    from states import State, VlmResponse
+
+    class ChatCalls(BaseCallbackHandler):
+        def __init__(self):
+            self.calls = 0
+
+        def on_chat_model_start(self, serialized, messages, **kwargs):
+            self.calls += 1
+
+    def make_state(input_type, with_product, **fields):
+        product = VlmResponse(description={}, product_details={"product": "bag"}) if with_product else None
+        return State(session_id="check", msg=[], input_type=input_type, product_info=product, **fields)
+
+    errors = []
+    for edge, reads in EDGE_READS.items():
+        errors += check_reads(edge, reads, make_state)
+    print(f"EDGE_READS declarations: {'ok' if not errors else 'WRONG'}")
+    for error in errors:
+        print(f"  {error}")
+
+    agent = Shoppingass.get_instance()
+    after_graph = agent.graph
+    # the old wiring: the router runs on image turns too
+    image_reads = EDGE_READS[app_with_memory.workflow_edge]["image"]
+    image_reads.add("workflow")
+    before_graph = agent.compile_graph()
+    image_reads.discard("workflow")
+
+    folder = os.path.join(ROOT, "testing")
+    keys = []
+    for name in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, name), "rb") as f:
+            keys.append(BLOB_STORE.put(*prepare_image(f.read())))
+    # vision answers cached up front, the graphs differ only in the router
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        for key in keys:
+            agent.run_vision_prompts(key, agent.vision_prompts())
+
+    rows = {}
+    for mode, graph in (("before", before_graph), ("after", after_graph)):
+        calls, latencies = [], []
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            for i in range(args.turns):
+                counter = ChatCalls()
+                state = State(session_id=f"prune-{mode}-{i}", msg=[], input_type="image", image_key=keys[i % len(keys)])
+                start = time.perf_counter()
+                graph.invoke(state, config={"callbacks": [counter]})
+                latencies.append(time.perf_counter() - start)
+                calls.append(counter.calls)
+        rows[mode] = (statistics.mean(calls), statistics.median(latencies) * 1000)
+
+    print(f"{args.turns} image turns, vision results cached:")
+    print(f"{'':>6} | {'chat calls/turn':>15} | {'p50 ms':>7}")
+    for mode, (calls, p50) in rows.items():
+        print(f"{mode:>6} | {calls:>15.2f} | {p50:>7.0f}")
+    saved = rows["before"][0] - rows["after"][0]
+    print(f"router calls saved per image turn: {saved:.2f}")
+    if errors or saved != 1:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
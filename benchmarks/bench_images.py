@@ -0,0 +1,96 @@
+"""Vision payload size before/after image preprocessing.
+
+Run from the repo root:
+    python benchmarks/bench_images.py
+and with a real Groq key in .env to also time the VLM on both payloads:
+    python benchmarks/bench_images.py --live
+
+"before" is what the UI used to send: the upload re-saved in its original
+format and resolution, EXIF included. "after" is image_utils.prepare_image.
+Every image in testing/ is measured plus a synthetic 12MP phone photo,
+since the samples in testing/ are already small. The vision request
+carries the image twice per upload (one request per prompt), so bytes per
+upload are twice the base64 size.
+"""
+import argparse
+import base64
+import os
+import sys
+import time
+from io import BytesIO
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "Agentic"))
+
+from PIL import Image
+
+from image_utils import prepare_image
+
+
+def old_payload(data):
+    image = Image.open(BytesIO(data))
+    buffered = BytesIO()
+    image.save(buffered, format=image.format, exif=image.info.get("exif", b""))
+    return buffered.getvalue(), image.size
+
+
+def phone_photo():
+    """12MP JPEG with camera-like detail and an EXIF orientation tag."""
+    image = Image.effect_mandelbrot((4032, 3024), (-2.2, -1.2, 1.0, 1.2), 200).convert("RGB")
+    noise = Image.effect_noise((4032, 3024), 40).convert("RGB")
+    image = Image.blend(image, noise, 0.3)
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotated 90 degrees, as phones store portrait shots
+    buffered = BytesIO()
+    image.save(buffered, format="JPEG", quality=92, exif=exif)
+    return buffered.getvalue()
+
+
+def time_vlm(data, mime):
+    from app_with_memory import Shoppingass
+    from blob_store import BLOB_STORE
+    from prompts import prompt_info
+    agent = Shoppingass.get_instance()
+    image_key = BLOB_STORE.put(data, mime)
+    start = time.perf_counter()
+    agent.handle_image({"image_key": image_key, "prompt": prompt_info})
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--live", action="store_true", help="time a real vision call for both payloads")
+    args = parser.parse_args()
+
+    samples = []
+    folder = os.path.join(ROOT, "testing")
+    for name in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, name), "rb") as f:
+            samples.append((name, f.read()))
+    samples.append(("synthetic 12MP phone photo", phone_photo()))
+
+    total_before = total_after = 0
+    print(f"{'image':>40} | {'before':>11} {'b64 KB':>8} | {'after':>11} {'b64 KB':>8} {'prep ms':>7}"
+          + (f" | {'VLM before s':>12} {'VLM after s':>11}" if args.live else ""))
+    for name, data in samples:
+        before, before_size = old_payload(data)
+        start = time.perf_counter()
+        after, mime = prepare_image(data)
+        prep = time.perf_counter() - start
+        after_size = Image.open(BytesIO(after)).size
+        before_b64 = base64.b64encode(before).decode()
+        after_b64 = base64.b64encode(after).decode()
+        total_before += len(before_b64)
+        total_after += len(after_b64)
+        row = (f"{name[:40]:>40} | {'%dx%d' % before_size:>11} {len(before_b64) / 1024:>8.1f}"
+               f" | {'%dx%d' % after_size:>11} {len(after_b64) / 1024:>8.1f} {prep * 1000:>7.1f}")
+        if args.live:
+            before_mime = Image.MIME.get(Image.open(BytesIO(data)).format, "image/jpeg")
+            row += f" | {time_vlm(before, before_mime):>12.2f} {time_vlm(after, mime):>11.2f}"
+        print(row)
+    print(f"total base64 per upload (2 vision calls): {2 * total_before / 1024:.0f}KB -> {2 * total_after / 1024:.0f}KB"
+          f" ({100 * (1 - total_after / total_before):.0f}% less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""Replay JSONL conversation traces through the agent graph and report.
+
+Run from the repo root against the offline fakes (AGENT_BACKEND=fake, needs fakeredis):
+    python benchmarks/bench_replay.py --trace benchmarks/traces/sample.jsonl --copies 10 --concurrency 10
+against the real backends (API keys in .env, redis on localhost):
+    python benchmarks/bench_replay.py --live --copies 1 --concurrency 1
+and compare with an earlier run:
+    python benchmarks/bench_replay.py --baseline before.json --out after.json
+
+A trace line is one turn, either
+    {"session": "s1", "type": "text", "text": "what is this made of?"}
+    {"session": "s1", "type": "image", "image": "testing/some_photo.jpg"}
+Turns of one session run in order; --copies replays every session that
+many times under fresh ids and --concurrency sessions run at once, each on
+its own thread.
+
+Reported: wall time and turns/s, latency percentiles per route and per
+node, chat-model calls per turn (from LangChain callbacks, so the router,
+context and chat calls are all counted) and vision calls per image turn,
+redis payload bytes read / written and commands per turn (through a
+counting proxy around the redis client), and cache stats. Everything is
+also written to --out as JSON.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "Agentic"))
+DEFAULT_TRACE = os.path.join(os.path.dirname(__file__), "traces", "sample.jsonl")
+
+
+def payload_size(value):
+    """Bytes of a redis argument or reply, ignoring protocol framing."""
+    if value is None:
+        return 0
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, dict):
+        return sum(payload_size(k) + payload_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sum(payload_size(v) for v in value)
+    return len(str(value))
+
+
+class RedisCounter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.written = 0
+        self.read = 0
+        self.commands = 0
+
+    def add(self, written=0, read=0, commands=0):
+        with self.lock:
+            self.written += written
+            self.read += read
+            self.commands += commands
+
+
+class CountingPipeline:
+    def __init__(self, pipe, counter):
+        self._pipe = pipe
+        self._counter = counter
+
+    def __enter__(self):
+        self._pipe.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._pipe.__exit__(*exc)
+
+    def execute(self, *args, **kwargs):
+        results = self._pipe.execute(*args, **kwargs)
+        self._counter.add(read=payload_size(results))
+        return results
+
+    def __getattr__(self, name):
+        attr = getattr(self._pipe, name)
+        if not callable(attr):
+            return attr
+
+        def queued(*args, **kwargs):
+            self._counter.add(written=payload_size(args) + payload_size(kwargs), commands=1)
+            return attr(*args, **kwargs)
+        return queued
+
+
+class CountingRedis:
+    """Proxy that tallies payload bytes of every command sent and reply read."""
+
+    def __init__(self, client, counter):
+        self._client = client
+        self._counter = counter
+
+    def pipeline(self, *args, **kwargs):
+        return CountingPipeline(self._client.pipeline(*args, **kwargs), self._counter)
+
+    def register_script(self, script):
+        from redis.commands.core import Script
+        return Script(self, script)
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def command(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            self._counter.add(written=payload_size(args) + payload_size(kwargs),
+                              read=payload_size(result), commands=1)
+            return result
+        return command
+
+
+def load_trace(path, copies):
+    sessions = defaultdict(list)
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                turn = json.loads(line)
+                sessions[turn["session"]].append(turn)
+    replay = []
+    for copy in range(copies):
+        for session, turns in sessions.items():
+            replay.append((f"{session}-{copy}-{int(time.time())}", turns))
+    return replay
+
+
+def load_image(path, images):
+    """BLOB_STORE key of a trace image, preprocessed the way the UI sends it."""
+    from blob_store import BLOB_STORE
+    from image_utils import prepare_image
+    if path not in images:
+        with open(os.path.join(ROOT, path), "rb") as f:
+            images[path] = BLOB_STORE.put(*prepare_image(f.read()))
+    return images[path]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trace", default=DEFAULT_TRACE)
+    parser.add_argument("--copies", type=int, default=5, help="replays of every session in the trace")
+    parser.add_argument("--concurrency", type=int, default=5, help="sessions running at once")
+    parser.add_argument("--live", action="store_true", help="use the real Groq / Tavily / Wikipedia / redis")
+    parser.add_argument("--out", default="replay_result.json")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    args = parser.parse_args()
+    if not args.live:
+        os.environ["AGENT_BACKEND"] = "fake"
+
+    # imported after AGENT_BACKEND is settled, the helpers read it at import
+    from langchain_core.callbacks import BaseCallbackHandler
+    import app_with_memory
+    from app_with_memory import Shoppingass, RedisClient, cache_stats
+    from latency import TRACKER, route_name
+    from states import State
+
+    class ChatCalls(BaseCallbackHandler):
+        def __init__(self):
+            self.calls = 0
+
+        def on_chat_model_start(self, serialized, messages, **kwargs):
+            self.calls += 1
+
+        def on_llm_start(self, serialized, prompts, **kwargs):
+            self.calls += 1
+
+    vision_calls = Counter()
+    get_llm_client = app_with_memory.get_llm_client
+
+    class CountingCompletions:
+        def __init__(self, completions):
+            self.completions = completions
+
+        def create(self, **kwargs):
+            vision_calls["calls"] += 1
+            return self.completions.create(**kwargs)
+
+    def counting_llm_client(*a, **k):
+        client = get_llm_client(*a, **k)
+        return type("Client", (), {"chat": type("Chat", (), {"completions": CountingCompletions(client.chat.completions)})})
+
+    app_with_memory.get_llm_client = counting_llm_client
+    counter = RedisCounter()
+    RedisClient._instance = CountingRedis(RedisClient.get_client(), counter)
+    agent = Shoppingass.get_instance()
+    TRACKER.reset()
+
+    replay = load_trace(args.trace, args.copies)
+    images = {}
+    turn_log = []
+    log_lock = threading.Lock()
+
+    def run_session(session):
+        session_id, turns = session
+        for turn in turns:
+            if turn["type"] == "image":
+                state = State(session_id=session_id, msg=[], input_type="image",
+                              image_key=load_image(turn["image"], images))
+            else:
+                state = State(session_id=session_id, msg=[turn["text"]], input_type="text")
+            calls = ChatCalls()
+            start = time.perf_counter()
+            result = agent.graph.invoke(state, config={"callbacks": [calls]})
+            elapsed = time.perf_counter() - start
+            TRACKER.record("route", route_name(result), elapsed)
+            with log_lock:
+                turn_log.append({"route": route_name(result), "type": turn["type"], "seconds": elapsed, "chat_calls": calls.calls})
+
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(run_session, replay))
+        wall = time.perf_counter() - start
+
+    turns = len(turn_log)
+    image_turns = sum(1 for t in turn_log if t["type"] == "image")
+    by_route = defaultdict(list)
+    for t in turn_log:
+        by_route[t["route"]].append(t)
+    summary = TRACKER.summary()
+    result = {
+        "config": {"trace": os.path.relpath(args.trace, ROOT), "copies": args.copies, "concurrency": args.concurrency,
+                   "backend": "live" if args.live else "fake", "sessions": len(replay)},
+        "turns": turns,
+        "wall_s": wall,
+        "throughput_turns_per_s": turns / wall,
+        "routes": summary["route"],
+        "nodes": summary["node"],
+        "llm_calls": {
+            "chat_per_turn": sum(t["chat_calls"] for t in turn_log) / turns,
+            "chat_per_turn_by_route": {r: sum(t["chat_calls"] for t in ts) / len(ts) for r, ts in by_route.items()},
+            "vision_per_image_turn": vision_calls["calls"] / image_turns if image_turns else 0,
+        },
+        "redis": {
+            "bytes_written_per_turn": counter.written / turns,
+            "bytes_read_per_turn": counter.read / turns,
+            "commands_per_turn": counter.commands / turns,
+        },
+        "caches": cache_stats(),
+    }
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print(f"{turns} turns from {len(replay)} sessions at concurrency {args.concurrency}: "
+          f"{wall:.2f}s, {result['throughput_turns_per_s']:.1f} turns/s")
+    print(f"{'route':>12} | {'turns':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} | {'chat calls/turn':>15}")
+    for route, stats in sorted(result["routes"].items()):
+        print(f"{route:>12} | {stats['count']:>5} {stats['p50_ms']:>8.0f} {stats['p95_ms']:>8.0f} {stats['p99_ms']:>8.0f}"
+              f" | {result['llm_calls']['chat_per_turn_by_route'][route]:>15.2f}")
+    print(f"vision calls per image turn: {result['llm_calls']['vision_per_image_turn']:.2f}")
+    print(f"redis per turn: {result['redis']['bytes_written_per_turn']:.0f}B written, "
+          f"{result['redis']['bytes_read_per_turn']:.0f}B read, {result['redis']['commands_per_turn']:.1f} commands")
+    print(f"results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            base = json.load(f)
+        print(f"\nvs {args.baseline}:")
+        print(f"  throughput: {base['throughput_turns_per_s']:.1f} -> {result['throughput_turns_per_s']:.1f} turns/s")
+        for route, stats in sorted(result["routes"].items()):
+            old = base["routes"].get(route)
+            if old:
+                print(f"  {route:>12} p50: {old['p50_ms']:.0f} -> {stats['p50_ms']:.0f}ms, p95: {old['p95_ms']:.0f} -> {stats['p95_ms']:.0f}ms")
+        print(f"  chat calls per turn: {base['llm_calls']['chat_per_turn']:.2f} -> {result['llm_calls']['chat_per_turn']:.2f}")
+        print(f"  redis bytes per turn: {base['redis']['bytes_written_per_turn'] + base['redis']['bytes_read_per_turn']:.0f}"
+              f" -> {result['redis']['bytes_written_per_turn'] + result['redis']['bytes_read_per_turn']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
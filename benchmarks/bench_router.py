@@ -0,0 +1,77 @@
+"""Router LLM calls saved by the local fast-path router.
+
+Run from the repo root:
+    python benchmarks/bench_router.py [--data Agentic/data/router_examples.jsonl]
+
+Every text turn used to cost one structured LLM call in router_node. This
+replays the labelled messages through FastRouter and reports how many
+would still reach the LLM, how often the local decision disagrees with the
+label and how many messages labelled null (chat only the LLM should
+route) were decided locally anyway. With scikit-learn installed the TF-IDF classifier is also
+scored, leave-one-out so it never sees the message it is asked about.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Agentic")))
+
+import fast_router
+from fast_router import FastRouter, load_examples
+
+DEFAULT_DATA = os.path.join(os.path.dirname(__file__), "..", "Agentic", "data", "router_examples.jsonl")
+
+
+def evaluate(name, routers, texts, labels):
+    wrong, leaked = [], []
+    start = time.perf_counter()
+    fallbacks = 0
+    for router, text, label in zip(routers, texts, labels):
+        tool = router.route(text)
+        if tool is None:
+            fallbacks += 1
+        elif label is None:
+            leaked.append((text, tool))
+        elif tool != label:
+            wrong.append((text, tool, label))
+    elapsed = time.perf_counter() - start
+    n = len(texts)
+    print(f"{name}:")
+    print(f"  LLM router calls: {n} -> {fallbacks} ({100 * (n - fallbacks) / n:.0f}% fewer)")
+    print(f"  local decisions disagreeing with label: {len(wrong)}")
+    for text, tool, label in wrong:
+        print(f"    {text!r}: {tool} (expected {label})")
+    print(f"  routed locally although the LLM should decide: {len(leaked)}")
+    for text, tool in leaked:
+        print(f"    {text!r}: {tool}")
+    print(f"  local routing time: {elapsed / n * 1e6:.1f}us per message")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=DEFAULT_DATA)
+    args = parser.parse_args()
+    texts, labels = load_examples(args.data)
+
+    rules = FastRouter()
+    evaluate("rules only", [rules] * len(texts), texts, labels)
+
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+    except ImportError:
+        print("scikit-learn not installed, skipping the classifier run")
+        return
+    routers = []
+    for i in range(len(texts)):
+        model = make_pipeline(TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True), LogisticRegression(max_iter=1000))
+        train = [(t, l) for j, (t, l) in enumerate(zip(texts, labels)) if j != i and l is not None]
+        model.fit([t for t, _ in train], [l for _, l in train])
+        routers.append(FastRouter(classifier=model))
+    evaluate(f"rules + classifier (threshold {fast_router.FAST_ROUTER_THRESHOLD})", routers, texts, labels)
+
+
+if __name__ == "__main__":
+    main()
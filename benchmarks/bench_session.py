@@ -0,0 +1,99 @@
+"""Per-turn redis cost of the session store vs the old single JSON blob.
+
+Run from the repo root against fakeredis (pip install fakeredis):
+    python benchmarks/bench_session.py
+or against a real server:
+    python benchmarks/bench_session.py --redis-url redis://127.0.0.1:6379/15
+
+For each history length the old path (GET + json.loads + concat +
+json.dumps + SETEX of the whole history) and SessionStore.append are timed
+for one more turn, together with the bytes sent to redis. A long simulated
+session then shows redis bytes and the injected window staying flat.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Agentic")))
+
+from session_store import SessionStore
+from memory_window import ConversationWindow, count_tokens
+
+TURN = ["what material is this made of?", "It is made of 100% cotton with a soft, breathable weave."]
+
+
+def connect(url):
+    if url:
+        import redis
+        return redis.Redis.from_url(url, decode_responses=True)
+    import fakeredis
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def blob_turn(client, key, msg):
+    # what message_to_memory used to do on every text turn
+    existing = client.get(key)
+    memory = json.loads(existing) if existing else {"product_info": [], "product_details": [], "short_term_memory": []}
+    memory["short_term_memory"] = memory["short_term_memory"] + msg
+    payload = json.dumps(memory)
+    client.setex(key, 120, payload)
+    return len(payload) + (len(existing) if existing else 0)
+
+
+def store_turn(store, session_id, msg):
+    store.append(session_id, msg)
+    return sum(len(json.dumps(m)) for m in msg)
+
+
+def per_turn(fn, runs, reset=None):
+    elapsed = 0.0
+    moved = 0
+    for _ in range(runs):
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        moved = fn()
+        elapsed += time.perf_counter() - start
+    return elapsed / runs, moved
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--redis-url", help="real redis to use instead of fakeredis")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--lua", action="store_true", help="append through the Lua script")
+    args = parser.parse_args()
+    client = connect(args.redis_url)
+    store = SessionStore(client, ttl=120, max_messages=50, use_lua=args.lua)
+
+    print(f"{'history':>8} | {'blob ms':>8} {'blob bytes':>10} | {'store ms':>8} {'store bytes':>11}")
+    for history in (10, 100, 1000, 5000):
+        blob = json.dumps({"product_info": [], "product_details": [], "short_term_memory": TURN * (history // 2)})
+        client.delete(store.messages_key("bench"))
+        store.append("bench", TURN * (history // 2))
+
+        # the blob is reset before each run so every turn sees the same history length
+        blob_s, blob_bytes = per_turn(lambda: blob_turn(client, "bench_blob", TURN), args.runs,
+                                      reset=lambda: client.set("bench_blob", blob))
+        store_s, store_bytes = per_turn(lambda: store_turn(store, "bench", TURN), args.runs)
+        print(f"{history:>8} | {blob_s * 1000:>8.3f} {blob_bytes:>10} | {store_s * 1000:>8.3f} {store_bytes:>11}")
+    client.delete("bench_blob", store.messages_key("bench"), store.product_key("bench"), store.last_message_key("bench"))
+
+    print()
+    print(f"{'turns':>8} | {'redis list bytes':>16} | {'window msgs':>11} {'window tokens':>13}")
+    window = ConversationWindow()
+    for turn in range(1, 501):
+        store.append("long", TURN, {"links": [{"title": "t", "url": "https://example.com", "content": "x" * 300}] * 10})
+        if turn in (1, 10, 50, 100, 500):
+            stored = client.lrange(store.messages_key("long"), 0, -1)
+            messages, _ = store.load("long")
+            fitted = window.fit(messages)
+            tokens = sum(count_tokens(m) for m in fitted)
+            print(f"{turn:>8} | {sum(len(m) for m in stored):>16} | {len(fitted):>11} {tokens:>13}")
+    client.delete(store.messages_key("long"), store.tools_key("long"), store.last_message_key("long"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Follow-up questions answered from the stored product JSON vs the LLM context check.
+
+Run from the repo root:
+    python benchmarks/bench_structured_qa.py [--data Agentic/data/qa_examples.jsonl]
+
+Every context_node turn used to cost one LLM call. This replays labelled
+follow-ups ("intent" is the field that answers them, null for questions
+that need the LLM) through StructuredQA against a sample product and
+reports how many are answered locally, how many are answered with the
+wrong field or answered although they should have gone to the LLM, and
+the time per question.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Agentic")))
+
+from structured_qa import StructuredQA
+
+DEFAULT_DATA = os.path.join(os.path.dirname(__file__), "..", "Agentic", "data", "qa_examples.jsonl")
+
+PRODUCT_DETAILS = {"product": "t-shirt", "brand": "Nike", "style": "Graphic T-shirt", "material": "Cotton",
+                   "colour": "Black", "quality": "High", "size": "M", "features": ["Breathable", "Crew neck"]}
+DESCRIPTION = {"product_name": "Nike Graphic T-Shirt", "category": "Fashion - Apparel",
+               "detailed_explanation": "A short-sleeved cotton t-shirt with a printed graphic.",
+               "common_uses": ["Casual wear", "Gym"], "who_might_use_this": ["Teens", "Athletes"],
+               "related_products_or_alternatives": ["Adidas Originals Tee", "Puma Graphic Tee"]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=DEFAULT_DATA)
+    args = parser.parse_args()
+    with open(args.data) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+
+    qa = StructuredQA()
+    wrong, leaked, missed = [], [], []
+    start = time.perf_counter()
+    for row in rows:
+        intent = qa.intent(row["text"])
+        answer = qa.answer(row["text"], PRODUCT_DETAILS, DESCRIPTION)
+        if row["intent"] is None and answer is not None:
+            leaked.append((row["text"], answer))
+        elif row["intent"] is not None and answer is None:
+            missed.append(row["text"])
+        elif row["intent"] is not None and intent != row["intent"]:
+            wrong.append((row["text"], intent, row["intent"]))
+    per_question = (time.perf_counter() - start) / len(rows) / 2 * 1e6
+
+    lookups = sum(1 for row in rows if row["intent"] is not None)
+    answered = qa.stats()["answered"]
+    print(f"{len(rows)} follow-ups, {lookups} of them plain attribute lookups")
+    print(f"  context LLM calls: {len(rows)} -> {len(rows) - answered} ({100 * answered / len(rows):.0f}% fewer)")
+    print(f"  lookups answered locally: {lookups - len(missed)}/{lookups}")
+    print(f"  answered with the wrong field: {len(wrong)}")
+    for text, got, label in wrong:
+        print(f"    {text!r}: {got}, expected {label}")
+    print(f"  answered although the LLM was needed: {len(leaked)}")
+    for text, answer in leaked:
+        print(f"    {text!r}: {answer!r}")
+    if missed:
+        print(f"  left to the LLM: {', '.join(repr(t) for t in missed)}")
+    print(f"  {per_question:.0f}us per question")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Reply to an image upload: LLM restatement vs local template (SUMMARY_MODE).
+
+Run from the repo root against the offline fakes:
+    python benchmarks/bench_summary.py --turns 10
+
+render_detection is timed on its own, then image turns go through the
+graph once per mode with the vision answers cached, so the difference is
+the summary alone. Chat calls are counted through LangChain callbacks;
+in enhance mode the LLM rewrite runs after the turn has been answered and
+is not part of the turn.
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import time
+import timeit
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "Agentic"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+    os.environ["AGENT_BACKEND"] = "fake"
+
+    from langchain_core.callbacks import BaseCallbackHandler
+    import app_with_memory
+    from app_with_memory import Shoppingass
+    from blob_store import BLOB_STORE
+    from image_utils import prepare_image
+    from states import State
+    from summary import render_detection
+
+    class ChatCalls(BaseCallbackHandler):
+        def __init__(self):
+            self.calls = 0
+
+        def on_chat_model_start(self, serialized, messages, **kwargs):
+            self.calls += 1
+
+    details = {"product": "t-shirt", "brand": "Nike", "style": "Graphic T-shirt", "material": "Cotton",
+               "features": ["Breathable", "Crew neck"]}
+    runs = 10000
+    render_us = timeit.timeit(lambda: render_detection(details), number=runs) / runs * 1e6
+    print(f"render_detection: {render_us:.1f}us per reply\n")
+    print(render_detection(details) + "\n")
+
+    agent = Shoppingass.get_instance()
+    folder = os.path.join(ROOT, "testing")
+    keys = []
+    for name in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, name), "rb") as f:
+            keys.append(BLOB_STORE.put(*prepare_image(f.read())))
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        for key in keys:
+            agent.run_vision_prompts(key, agent.vision_prompts())
+
+    print(f"{args.turns} image turns, vision results cached:")
+    print(f"{'mode':>8} | {'chat calls/turn':>15} | {'p50 ms':>7} {'mean ms':>7}")
+    for mode in ("llm", "local", "enhance"):
+        app_with_memory.SUMMARY_MODE = mode
+        calls, latencies = [], []
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            for i in range(args.turns):
+                counter = ChatCalls()
+                state = State(session_id=f"summary-{mode}-{i}", msg=[], input_type="image", image_key=keys[i % len(keys)])
+                start = time.perf_counter()
+                agent.graph.invoke(state, config={"callbacks": [counter]})
+                latencies.append(time.perf_counter() - start)
+                calls.append(counter.calls)
+        print(f"{mode:>8} | {statistics.mean(calls):>15.2f} | {statistics.median(latencies) * 1000:>7.1f}"
+              f" {statistics.mean(latencies) * 1000:>7.1f}")
+    app_with_memory.SUMMARY_EXECUTOR.shutdown(wait=True)
+    rewrite = agent.session_store.tool_payload(f"summary-enhance-{args.turns - 1}", "summary")
+    print(f"\nenhance mode stored the LLM rewrite for the session: {rewrite is not None}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Image-turn latency of vision_node against a stubbed slow Groq client.
+
+Run from the repo root:
+    python benchmarks/bench_vision.py --latency 0.8 --runs 5
+
+With both prompts sent concurrently the node should take roughly one
+round-trip instead of two, and a repeat of the same image should skip the
+VLM entirely through the vision cache.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Agentic")))
+os.environ.setdefault("GROQ_API", "bench")
+
+import app_with_memory
+from app_with_memory import Shoppingass
+from states import State
+
+
+class SlowCompletions:
+    def __init__(self, latency, fail_prompt=None):
+        self.latency = latency
+        self.fail_prompt = fail_prompt
+
+    def create(self, model, messages, **kwargs):
+        time.sleep(self.latency)
+        text = messages[0]["content"][0]["text"]
+        if self.fail_prompt is not None and text == self.fail_prompt:
+            raise RuntimeError("stubbed vision failure")
+        if "product_name" in text:
+            content = {"product_name": "Nike Graphic T-Shirt", "category": "Fashion - Apparel"}
+        else:
+            content = {"product": "t-shirt", "brand": "Nike"}
+        message = SimpleNamespace(content=json.dumps(content))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class SlowClient:
+    def __init__(self, latency, fail_prompt=None):
+        self.chat = SimpleNamespace(completions=SlowCompletions(latency, fail_prompt))
+
+
+def sequential_vision(agent, state):
+    # the pre-concurrency behaviour, kept here as the baseline
+    image_key = agent.image_key(state)
+    info = agent.handle_image({'image_key': image_key, 'prompt': app_with_memory.prompt_info})
+    desc = agent.handle_image({'image_key': image_key, 'prompt': app_with_memory.prompt_description})
+    return info, desc
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return sum(samples) / len(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per stubbed VLM call")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    app_with_memory.get_llm_client = lambda: SlowClient(args.latency)
+    # the stub answers with whole completions
+    app_with_memory.VISION_STREAM = False
+    # skip redis and graph compilation, only the node is measured
+    agent = Shoppingass.__new__(Shoppingass)
+    make_state = lambda: State(session_id="bench", msg=[], input_type="image", image_bytes="aGVsbG8=")
+
+    seq = timed(lambda: sequential_vision(agent, make_state()), args.runs)
+
+    def uncached():
+        app_with_memory.VISION_CACHE.local.clear()
+        agent.vision_node(make_state())
+
+    conc = timed(uncached, args.runs)
+    cached = timed(lambda: agent.vision_node(make_state()), args.runs)
+    print(f"stub round-trip:      {args.latency:.3f}s")
+    print(f"sequential (before):  {seq:.3f}s")
+    print(f"concurrent (after):   {conc:.3f}s  ({seq / conc:.2f}x faster)")
+    print(f"repeat image (cached): {cached * 1000:.3f}ms  {app_with_memory.VISION_CACHE.stats()}")
+
+    app_with_memory.get_llm_client = lambda: SlowClient(args.latency, fail_prompt=app_with_memory.prompt_description)
+    app_with_memory.VISION_CACHE.local.clear()
+    state = agent.vision_node(make_state())
+    print(f"one call failing:     product_details={state.product_info.product_details} "
+          f"description={state.product_info.description}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Two vision calls per upload (VISION_MODE=dual) vs one combined call (single).
+
+Run from the repo root against the offline fakes:
+    python benchmarks/bench_vision_modes.py --repeat 5
+and with a real Groq key in .env:
+    python benchmarks/bench_vision_modes.py --live --repeat 3
+
+Every image in testing/ goes through the vision node once per mode and
+repetition, with VISION_CACHE cleared first so each upload really hits the
+model. Requests and token counts come from the usage block of every
+completion, latency is the wall time of the vision node. On the fakes the
+token counts are estimates (4 characters a token, ~1200 per image).
+Streaming is turned off here since only whole completions report usage.
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "Agentic"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--live", action="store_true", help="use the real Groq vision model")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if not args.live:
+        os.environ["AGENT_BACKEND"] = "fake"
+
+    import app_with_memory
+    from app_with_memory import Shoppingass
+    from blob_store import BLOB_STORE
+    from image_utils import prepare_image
+    from states import State
+
+    usage = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    get_llm_client = app_with_memory.get_llm_client
+
+    class CountingCompletions:
+        def __init__(self, completions):
+            self.completions = completions
+
+        def create(self, **kwargs):
+            completion = self.completions.create(**kwargs)
+            usage["requests"] += 1
+            usage["prompt_tokens"] += completion.usage.prompt_tokens
+            usage["completion_tokens"] += completion.usage.completion_tokens
+            return completion
+
+    def counting_llm_client(*a, **k):
+        client = get_llm_client(*a, **k)
+        return type("Client", (), {"chat": type("Chat", (), {"completions": CountingCompletions(client.chat.completions)})})
+
+    app_with_memory.get_llm_client = counting_llm_client
+    app_with_memory.VISION_STREAM = False
+    agent = Shoppingass.get_instance()
+    folder = os.path.join(ROOT, "testing")
+    keys = []
+    for name in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, name), "rb") as f:
+            keys.append(BLOB_STORE.put(*prepare_image(f.read())))
+
+    rows = {}
+    for mode in ("dual", "single"):
+        app_with_memory.VISION_MODE = mode
+        for key in usage:
+            usage[key] = 0
+        latencies = []
+        missing = 0
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            for _ in range(args.repeat):
+                for key in keys:
+                    app_with_memory.VISION_CACHE.local.clear()
+                    state = State(session_id="bench", msg=[], input_type="image", image_key=key)
+                    start = time.perf_counter()
+                    info = agent.vision_node(state).product_info
+                    latencies.append(time.perf_counter() - start)
+                    missing += not (info.product_details and info.description)
+        uploads = len(latencies)
+        rows[mode] = {
+            "requests": usage["requests"] / uploads,
+            "prompt_tokens": usage["prompt_tokens"] / uploads,
+            "completion_tokens": usage["completion_tokens"] / uploads,
+            "p50_ms": statistics.median(latencies) * 1000,
+            "mean_ms": statistics.mean(latencies) * 1000,
+            "incomplete": missing,
+        }
+
+    print(f"{len(keys)} images x {args.repeat} repeats, {'live' if args.live else 'fake'} backend, per upload:")
+    print(f"{'mode':>7} | {'requests':>8} {'prompt tok':>10} {'compl tok':>9} {'total tok':>9} | {'p50 ms':>7} {'mean ms':>7} | incomplete")
+    for mode, row in rows.items():
+        print(f"{mode:>7} | {row['requests']:>8.1f} {row['prompt_tokens']:>10.0f} {row['completion_tokens']:>9.0f}"
+              f" {row['prompt_tokens'] + row['completion_tokens']:>9.0f} | {row['p50_ms']:>7.0f} {row['mean_ms']:>7.0f}"
+              f" | {row['incomplete']}")
+    dual, single = rows["dual"], rows["single"]
+    saved = 1 - (single["prompt_tokens"] + single["completion_tokens"]) / (dual["prompt_tokens"] + dual["completion_tokens"])
+    print(f"single call: {100 * saved:.0f}% fewer tokens, latency {dual['p50_ms']:.0f} -> {single['p50_ms']:.0f}ms p50")
+
+
+if __name__ == "__main__":
+    main()
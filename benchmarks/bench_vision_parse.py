@@ -0,0 +1,130 @@
+"""Vision answers that survive parsing: json.loads-or-string vs json_extract.
+
+Run from the repo root against the offline fakes, with a share of the
+answers broken the way real VLM output breaks (code fences, prose around
+the object, trailing commas, cut off by max_tokens, a missing key):
+    python benchmarks/bench_vision_parse.py --noise 0.3 --uploads 40
+
+"before" is the old handle_image: a whole completion, json.loads, and the
+raw string kept when that fails. An upload whose product_details has no
+"product" breaks wiki_node / scraping_node_tav, so the user uploads again
+(up to --reuploads times) and both prompts are paid for again. "after" is
+the current vision node: streamed answers cut at the closing brace,
+repaired, validated against the prompt's schema and only the failed prompt
+asked again (VISION_RETRIES).
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "Agentic"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--noise", type=float, default=0.3, help="share of broken vision answers")
+    parser.add_argument("--uploads", type=int, default=40)
+    parser.add_argument("--reuploads", type=int, default=2, help="times a user retries a failed upload")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    os.environ["AGENT_BACKEND"] = "fake"
+    os.environ["FAKE_VISION_NOISE"] = str(args.noise)
+
+    import app_with_memory
+    from app_with_memory import Shoppingass, VISION_PROMPTS
+    from blob_store import BLOB_STORE
+    from image_utils import prepare_image
+    from states import State
+
+    calls = Counter()
+    get_llm_client = app_with_memory.get_llm_client
+
+    class CountingCompletions:
+        def __init__(self, completions):
+            self.completions = completions
+
+        def create(self, **kwargs):
+            calls[mode] += 1
+            return self.completions.create(**kwargs)
+
+    def counting_llm_client(*a, **k):
+        client = get_llm_client(*a, **k)
+        return type("Client", (), {"chat": type("Chat", (), {"completions": CountingCompletions(client.chat.completions)})})
+
+    app_with_memory.get_llm_client = counting_llm_client
+    agent = Shoppingass.get_instance()
+    # every upload has to reach the model
+    app_with_memory.VISION_CACHE.get = lambda image_key, prompt_name: None
+    folder = os.path.join(ROOT, "testing")
+    keys = []
+    for name in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, name), "rb") as f:
+            keys.append(BLOB_STORE.put(*prepare_image(f.read())))
+    uploads = [keys[i % len(keys)] for i in range(args.uploads)]
+
+    def old_parse(response):
+        # the pre-json_extract behaviour, kept here as the baseline
+        try:
+            return json.loads(response)
+        except json.JSONDecodeError:
+            return response
+
+    def old_call(key, prompt):
+        request = agent.vision_request({"image_key": key, "prompt": prompt})
+        request["stream"] = False
+        try:
+            completion = app_with_memory.get_llm_client().chat.completions.create(**request)
+        finally:
+            BLOB_STORE.release_data_url(key)
+        return old_parse(completion.choices[0].message.content)
+
+    def old_vision(key):
+        # both prompts in parallel, as the node sends them
+        futures = {name: app_with_memory.VISION_EXECUTOR.submit(old_call, key, prompt)
+                   for name, prompt in VISION_PROMPTS.items()}
+        return futures["prompt_info"].result()
+
+    def new_vision(key):
+        state = State(session_id="bench", msg=[], input_type="image", image_key=key)
+        try:
+            return agent.vision_node(state).product_info.product_details
+        except RuntimeError:
+            return None
+
+    def upload(vision, key):
+        start = time.perf_counter()
+        for attempt in range(args.reuploads + 1):
+            details = vision(key)
+            if isinstance(details, dict) and details.get("product"):
+                return attempt, time.perf_counter() - start
+        return None, time.perf_counter() - start
+
+    rows = {}
+    for mode, vision in (("before", old_vision), ("after", new_vision)):
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                outcomes = list(pool.map(lambda key: upload(vision, key), uploads))
+        attempts = [a for a, _ in outcomes]
+        rows[mode] = {
+            "first": sum(1 for a in attempts if a == 0),
+            "usable": sum(1 for a in attempts if a is not None),
+            "calls": calls[mode],
+            "p50": statistics.median(t for _, t in outcomes) * 1000,
+        }
+
+    print(f"{args.uploads} uploads, {100 * args.noise:.0f}% of vision answers broken, up to {args.reuploads} re-uploads")
+    print(f"{'':>6} | {'usable 1st upload':>17} {'usable at all':>13} | {'vision calls':>12} {'per usable':>10} | {'p50 ms':>7}")
+    for mode, row in rows.items():
+        per_usable = row["calls"] / row["usable"] if row["usable"] else float("nan")
+        print(f"{mode:>6} | {row['first']:>17} {row['usable']:>13} | {row['calls']:>12} {per_usable:>10.2f} | {row['p50']:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
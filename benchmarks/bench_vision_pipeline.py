@@ -0,0 +1,85 @@
+"""Image turns that wait for both vision prompts vs PIPELINED_VISION.
+
+Run from the repo root against the offline fakes:
+    python benchmarks/bench_vision_pipeline.py --sessions 8 --description-delay 1.5
+
+Each session uploads an image and then asks a follow-up question, either
+right away or after --think seconds. The real prompt_description answer is
+several times longer than the attribute JSON; --description-delay adds that
+generation time to the fake. Reported per mode: time to the image reply,
+time of the follow-up turn (which waits for the description only if it is
+still pending), and whether the follow-up saw the description and the
+session ended up with it stored.
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "Agentic"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--description-delay", type=float, default=1.5, help="extra seconds for prompt_description")
+    parser.add_argument("--think", type=float, default=0.0, help="seconds between the reply and the follow-up")
+    args = parser.parse_args()
+    os.environ["AGENT_BACKEND"] = "fake"
+
+    import app_with_memory
+    from app_with_memory import Shoppingass
+    from blob_store import BLOB_STORE
+    from image_utils import prepare_image
+    from states import State
+
+    agent = Shoppingass.get_instance()
+    # every upload has to reach the model
+    app_with_memory.VISION_CACHE.get = lambda image_key, prompt_name: None
+    handle_image = agent.handle_image
+
+    def slow_description(params):
+        if params.get('name') == 'prompt_description':
+            time.sleep(args.description_delay)
+        return handle_image(params)
+
+    agent.handle_image = slow_description
+    folder = os.path.join(ROOT, "testing")
+    keys = []
+    for name in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, name), "rb") as f:
+            keys.append(BLOB_STORE.put(*prepare_image(f.read())))
+
+    print(f"{args.sessions} sessions, description +{args.description_delay}s, follow-up after {args.think}s")
+    print(f"{'mode':>9} | {'image reply p50 ms':>18} | {'follow-up p50 ms':>16} | {'total p50 ms':>12} | "
+          f"{'follow-up saw desc':>18} {'desc stored':>11}")
+    for pipelined in (False, True):
+        app_with_memory.PIPELINED_VISION = pipelined
+        replies, follow_ups, totals, seen = [], [], [], 0
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            for i in range(args.sessions):
+                session_id = f"pipeline-{pipelined}-{i}-{time.time()}"
+                start = time.perf_counter()
+                agent.graph.invoke(State(session_id=session_id, msg=[], input_type="image", image_key=keys[i % len(keys)]))
+                replies.append(time.perf_counter() - start)
+                time.sleep(args.think)
+                start = time.perf_counter()
+                result = agent.graph.invoke(State(session_id=session_id, msg=["what is it used for?"], input_type="text"))
+                follow_ups.append(time.perf_counter() - start)
+                totals.append(replies[-1] + follow_ups[-1])
+                seen += bool(result['product_info'].description)
+            # let the last background writes land
+            time.sleep(args.description_delay + 2)
+        stored = sum(1 for key in agent.redis_client.scan_iter("user_memory:pipeline-*:product")
+                     if key.startswith(f"user_memory:pipeline-{pipelined}-")
+                     and agent.redis_client.hget(key, "description") not in (None, "{}"))
+        mode = "pipelined" if pipelined else "both"
+        print(f"{mode:>9} | {statistics.median(replies) * 1000:>18.0f} | {statistics.median(follow_ups) * 1000:>16.0f} | "
+              f"{statistics.median(totals) * 1000:>12.0f} | {seen:>15}/{args.sessions} {stored:>8}/{args.sessions}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Wikipedia lookups from the offline FTS5 index vs the live tool.
+
+Run from the repo root (offline, the live side is the fake tool):
+    python benchmarks/bench_wiki_index.py --articles 200000
+against real Wikipedia for the live side and the misses:
+    python benchmarks/bench_wiki_index.py --live
+
+No dump ships with the repo, so a corpus of --articles synthetic abstracts
+is generated, with one article per product category from wiki_cache.py
+mixed in. The index is built with wiki_index.build, then every category is
+looked up through get_wiki_tool() with WIKI_INDEX_PATH set, a few queries
+that miss the index fall back to the live tool, and the same categories go
+to the live tool directly for comparison.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "Agentic"))
+
+WORDS = ("cotton steel plastic leather wooden digital portable classic modern vintage electric wireless "
+         "garden kitchen travel sport outdoor office winter summer river mountain city history culture "
+         "music design engine battery screen fabric pattern colour brand market museum festival").split()
+SYLLABLES = "ka lo mi ren tsu var del os ib un ha qu ze po rin ta".split()
+# the last shares "pattern" and "fabric" with half the corpus but no article has every word
+MISSES = ["zxqv gadget", "flurbometer", "quantum kettle", "yellow and green paisley pattern fabric"]
+
+
+def synthetic(n, categories, seed=0):
+    rng = random.Random(seed)
+    for category in categories:
+        yield category.title(), f"A {category} is a widely sold consumer product. " + " ".join(rng.choices(WORDS, k=60))
+    for i in range(n):
+        # made-up names, as most titles of a real dump share no word with a product
+        title = " ".join("".join(rng.choices(SYLLABLES, k=3)) for _ in range(2)).title()
+        yield title, " ".join(rng.choices(WORDS, k=60))
+
+
+def timed(fn, queries):
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=200000)
+    parser.add_argument("--live", action="store_true", help="real Wikipedia for the live side")
+    args = parser.parse_args()
+    if not args.live:
+        os.environ["AGENT_BACKEND"] = "fake"
+
+    from wiki_cache import DEFAULT_CATEGORIES
+    import wiki_index
+
+    path = os.path.join(tempfile.mkdtemp(), "wiki_index.sqlite3")
+    start = time.perf_counter()
+    count = wiki_index.build(synthetic(args.articles, DEFAULT_CATEGORIES), path)
+    build_s = time.perf_counter() - start
+    print(f"built {count} articles in {build_s:.1f}s, {os.path.getsize(path) / 1024 / 1024:.1f}MB")
+
+    os.environ["WIKI_INDEX_PATH"] = path
+    wiki_index.WIKI_INDEX = wiki_index.WikiIndex(path)
+    import helper
+    helper.WIKI_INDEX = wiki_index.WIKI_INDEX
+    tool = helper.get_wiki_tool()
+    live = tool.fallback
+
+    tool.invoke(DEFAULT_CATEGORIES[0])  # open the connection
+    hits = timed(tool.invoke, DEFAULT_CATEGORIES * 10)
+    misses = timed(tool.invoke, MISSES)
+    direct = timed(live.invoke, DEFAULT_CATEGORIES[:5])
+    top = tool.invoke("headphones").split("\n")[0]
+
+    ms = lambda values, q: statistics.quantiles(values, n=100)[q - 1] * 1000 if len(values) > 1 else values[0] * 1000
+    print(f"{'':>22} | {'lookups':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    print(f"{'index hit':>22} | {len(hits):>7} {ms(hits, 50):>8.2f} {ms(hits, 99):>8.2f}")
+    print(f"{'index miss -> live':>22} | {len(misses):>7} {ms(misses, 50):>8.1f} {ms(misses, 99):>8.1f}")
+    print(f"{'live only':>22} | {len(direct):>7} {ms(direct, 50):>8.1f} {ms(direct, 99):>8.1f}")
+    print(f"top hit for 'headphones': {top}")
+    print(f"index stats: {wiki_index.WIKI_INDEX.stats()}")
+
+
+if __name__ == "__main__":
+    main()
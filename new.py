@@ -10,6 +10,7 @@ import re
 from langchain_community.tools.tavily_search import TavilySearchResults
 from dotenv import load_dotenv
 import json
+import uuid
 load_dotenv()
 # tavily_api=os.environ['tavily_api']
 API = os.environ['GROQ_API']
@@ -21,34 +22,35 @@ import time
 import base64
 from io import BytesIO
 from PIL import Image
-from Agentic.app_with_memory import Shoppingass
-from Agentic.states import State
+from Agentic.app_with_memory import Shoppingass, TRACKER, cache_stats, get_wiki_tool
+from Agentic.states import State, ProductDetails
+from Agentic.json_extract import extract_json, JSONExtractError
+from Agentic.image_utils import prepare_image
+from Agentic.blob_store import BLOB_STORE
 
 client = Groq(api_key=API)
-def xyz_function(input_data, input_type="text"):
+def xyz_function(input_data, input_type="text", session_id="default"):
     """
     This function processes either the user's message or uploaded image.
     
     Args:
-        input_data: Either a text message or base64 encoded image
+        input_data: Either a text message or the BLOB_STORE key of an image
         input_type: "text" or "image" to indicate the type of input
+        session_id: Key for this user's memory in redis
     
     Returns:
         The processed result as a string
     """
-    # Simulate processing time
-    time.sleep(1)
     s= None
     if input_type=='image':
         # print("img bytes1:",input_data[:30])
 
-        s = State(session_id="user1234",msg=[],input_type=input_type, image_bytes= input_data)
+        s = State(session_id=session_id,msg=[],input_type=input_type, image_key= input_data)
     
     else:
-        s = State(session_id="user1234",msg=[input_data],input_type=input_type)
+        s = State(session_id=session_id,msg=[input_data],input_type=input_type)
         
-    g = Shoppingass()
-    result=g.graph.invoke(s)
+    result=Shoppingass.get_instance().run(s)
     result = result.get('msg')[-1]
     if input_type == "text":
         # Process text message
@@ -71,14 +73,44 @@ def xyz_function(input_data, input_type="text"):
     #     print(f"---------------- {e}")
     return result
 
-def image_to_base64(image, format):
-    """Convert a PIL Image to base64 string"""
-    buffered = BytesIO()
-    image.save(buffered, format=format)
+def xyz_stream(input_data, input_type="text", session_id="default"):
+    """
+    Streaming version of xyz_function for st.write_stream.
 
-    img_str = base64.b64encode(buffered.getvalue()).decode()
-    # print("type is", type(img_str))
-    return img_str
+    Yields the reply tokens as the LLM produces them; link results are
+    yielded once, formatted like xyz_function does.
+    """
+    if input_type=='image':
+        s = State(session_id=session_id,msg=[],input_type=input_type, image_key= input_data)
+    else:
+        s = State(session_id=session_id,msg=[input_data],input_type=input_type)
+    for chunk in Shoppingass.get_instance().stream_reply(s):
+        if isinstance(chunk, list):
+            for item in chunk:
+                yield f"\n**Title:** {item['title']} \n **Url:** {item['url']} \n **Content:** {item['content']}\n"
+        else:
+            yield chunk
+
+def latency_panel():
+    """Sidebar table of p50/p95/p99 per route and per graph node."""
+    report = TRACKER.summary()
+    with st.sidebar.expander("⏱️ Latency"):
+        if not report["node"]:
+            st.caption("No turns measured yet")
+            return
+        for kind in ("route", "node"):
+            st.markdown(f"**Per {kind}**")
+            st.table([
+                {kind: name, "count": v["count"], "p50 ms": round(v["p50_ms"]), "p95 ms": round(v["p95_ms"]), "p99 ms": round(v["p99_ms"])}
+                for name, v in report[kind].items()
+            ])
+        st.download_button("Download JSON", TRACKER.dump_json(), file_name="latency.json", mime="application/json")
+        st.markdown("**Caches**")
+        st.json(cache_stats())
+
+def store_image(image):
+    """Downscale a PIL Image, keep it once in BLOB_STORE and return its key"""
+    return BLOB_STORE.put(*prepare_image(image))
     # image_data = uploaded_file.read()
 
     # image_data_url = base64.b64encode(image_data).decode()
@@ -116,6 +148,10 @@ if 'product' not in st.session_state:
 if 'temp_pdf_path' not in st.session_state:
     st.session_state['temp_pdf_path'] = None
 
+# one redis memory per browser session
+if 'session_id' not in st.session_state:
+    st.session_state['session_id'] = uuid.uuid4().hex
+
 
 st.set_page_config(
     page_title="Image Search App",
@@ -198,11 +234,8 @@ elif choice == "🤖 App":
                         # method 2
 
                         image = Image.open(uploaded_file)
-                        format = image.format
-
-                        buffered = BytesIO()
-                        image.save(buffered, format=format)
-                        image_data_url = f"data:image/jpeg;base64,{base64.b64encode(buffered.getvalue()).decode()}"
+                        image_key = store_image(image)
+                        image_data_url = BLOB_STORE.data_url(image_key)
                         prompt_template_vision = [
                             {
                                 "role": "user",
@@ -239,38 +272,34 @@ Return the result in JSON format. No description or any other content
                             }
                         ]
                         print(prompt_template_vision)
-                        completion = client.chat.completions.create(
-                            model="meta-llama/llama-4-scout-17b-16e-instruct",
-                            messages=prompt_template_vision,
-                            temperature=1,
-                            max_tokens=1024,
-                            top_p=1,
-                            stream=False,
-                            stop=None,
-                        )
+                        try:
+                            completion = client.chat.completions.create(
+                                model="meta-llama/llama-4-scout-17b-16e-instruct",
+                                messages=prompt_template_vision,
+                                temperature=1,
+                                max_tokens=1024,
+                                top_p=1,
+                                stream=False,
+                                stop=None,
+                            )
+                        finally:
+                            # a failed call must not keep the data URL pinned
+                            BLOB_STORE.release_data_url(image_key)
                         response = completion.choices[0].message.content
                         print("resp =",response)
 
-                        match = re.search(r'"product":\s*"([^"]+)"', response)
                         try:
-                            product = match.group(1)
+                            resp = extract_json(response, ProductDetails)
+                            product = resp['product']
                     
                             st.session_state.product = product
                             print("prod=", product)
-                            try:
-                                resp = json.loads(response)
-                                st.write('### Detection:')
+                            st.write('### Detection:')
 
-                                st.success(clean_resp(resp))
-                            except:
-                                st.write('### Detection:')
-                                st.success(response)
-
-                                
-                                
+                            st.success(clean_resp(resp))
                             # st.write(st.session_state.product)
 
-                        except:
+                        except JSONExtractError:
                             st.error(f"1111An error occurred\n Please Refresh the Page and try again")   
 
                     
@@ -283,8 +312,8 @@ Return the result in JSON format. No description or any other content
                 st.warning("⚠️ Please upload an Image first and Run Detection on it")
             else:
                 # try:
-                wiki_wrappper = WikipediaAPIWrapper(top_k_results=2, doc_content_chars_max=500)
-                wiki_tool = WikipediaQueryRun(api_wrapper= wiki_wrappper)
+                # the offline index when WIKI_INDEX_PATH is set, live Wikipedia otherwise
+                wiki_tool = get_wiki_tool(top_k_results=2, doc_content_chars_max=500)
                 with st.spinner('🔄 Processing...'):
                     query = f"what is {st.session_state.product}" 
                     res = wiki_tool.invoke(query)
@@ -351,9 +380,13 @@ elif choice == "🤖 Chatbot":
     # Display chat history
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
-            if message.get("image"):
-                # Display image in chat
-                st.image(f"data:image/jpeg;base64,{message['image']}", caption="Uploaded Image", width=300)
+            if message.get("image_key"):
+                # Display image in chat; the history keeps only the blob key
+                blob = BLOB_STORE.get(message["image_key"])
+                if blob is not None:
+                    st.image(blob.data, caption="Uploaded Image", width=300)
+                else:
+                    st.caption("(image no longer available)")
             else:
                 # Display text message
                 st.write(message["content"])
@@ -375,30 +408,24 @@ elif choice == "🤖 Chatbot":
             if st.session_state.last_processed_image != current_image_id:
                 # Open and convert the image
                 image = Image.open(uploaded_file)
-                format = image.format
-
-                # Convert image to base64
-                img_base64 = image_to_base64(image, format)
+                
+                # Downscale it and keep it in the blob store
+                image_key = store_image(image)
                 
                 # Add image message to chat history
                 st.session_state.messages.append({
                     "role": "user", 
                     "content": "Uploaded an image", 
-                    "image": img_base64
+                    "image_key": image_key
                 })
                 
                 # Display user's image message
                 with st.chat_message("user"):
                     st.image(image, caption="Uploaded Image", width=300)
                 
-                # Invoke xyz function with the image base64
-                with st.spinner("Processing image..."):
-                    result = xyz_function(img_base64, input_type="image")
-                
-                # Display assistant's response
+                # Stream the assistant's response as it is generated
                 with st.chat_message("assistant"):
-                    # st.write("I've processed your image. Here's the result:")
-                    st.write(result)
+                    result = st.write_stream(xyz_stream(image_key, input_type="image", session_id=st.session_state.session_id))
                 
                 # Add assistant response to chat history
                 st.session_state.messages.append({
@@ -427,21 +454,17 @@ elif choice == "🤖 Chatbot":
         with st.chat_message("user"):
             st.write(user_input)
         
-        # Invoke xyz function with user's text message
-        with st.spinner("Processing..."):
-            result = xyz_function(user_input, input_type="text")
-        
-        # Display assistant's response
+        # Stream the assistant's response as it is generated
         with st.chat_message("assistant"):
-            # st.write("I've processed your text. Here's the result:")
-            
-            st.write(result)
+            result = st.write_stream(xyz_stream(user_input, input_type="text", session_id=st.session_state.session_id))
         
         # Add assistant response to chat history
         st.session_state.messages.append({
             "role": "assistant", 
             "content": result
         })
+
+    latency_panel()
             
 
 # Contact Page